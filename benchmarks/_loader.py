@@ -0,0 +1,36 @@
+from __future__ import annotations
+import importlib
+import json
+import pathlib
+import sys
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parent
+COMPONENT = ROOT.parent / "custom_components" / "umnyeseti"
+PAYLOADS = ROOT / "payloads"
+
+def load(module: str):
+    # Import integration modules without running the package __init__ (which needs Home Assistant).
+    pkg = "umnyeseti"
+    if pkg not in sys.modules:
+        stub = types.ModuleType(pkg)
+        stub.__path__ = [str(COMPONENT)]
+        sys.modules[pkg] = stub
+    return importlib.import_module(f"{pkg}.{module}")
+
+def payload(name: str = "account.json") -> dict:
+    return json.loads((PAYLOADS / name).read_text(encoding="utf-8"))
+
+def with_history(base: dict, rows: int) -> dict:
+    # Grow the recorded payload to `rows` monthly payments going back in time.
+    data = json.loads(json.dumps(base))
+    template = data["data"]["activities"][0]
+    activities = []
+    for i in range(rows):
+        year, month = 2025 - (i // 12), 12 - (i % 12)
+        row = dict(template)
+        row["d_oper"] = f"{year:04d}-{month:02d}-{1 + i % 28:02d}T10:{i % 60:02d}:00.000+03:00"
+        row["n_value_1"] = 500 + (i % 7) * 50
+        activities.append(row)
+    data["data"]["activities"] = activities
+    return data
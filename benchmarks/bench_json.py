@@ -0,0 +1,51 @@
+"""Micro-benchmark: decoding the portal payload from raw bytes.
+
+Compares the previous path (decode to str, then stdlib json.loads) with
+api.loads() on the recorded payload grown to several history lengths.
+
+    python benchmarks/bench_json.py [--json results.json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import timeit
+
+from _loader import load, payload, with_history
+
+SIZES = (10, 100, 1000, 5000)
+
+def _legacy(body: bytes):
+    return json.loads(body.decode("utf-8"))
+
+def run(number: int) -> list[dict]:
+    api = load("api")
+    base = payload()
+    results = []
+    for rows in SIZES:
+        body = json.dumps(with_history(base, rows), ensure_ascii=False).encode("utf-8")
+        assert api.loads(body) == _legacy(body)
+        row = {"rows": rows, "bytes": len(body), "backend": "orjson" if api._fast_json else "json"}
+        for name, fn in (("legacy", _legacy), ("loads", api.loads)):
+            best = min(timeit.repeat(lambda: fn(body), number=number, repeat=5))
+            row[f"{name}_us"] = round(best / number * 1e6, 2)
+        row["speedup"] = round(row["legacy_us"] / row["loads_us"], 2)
+        results.append(row)
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+    results = run(args.number)
+    for r in results:
+        print(f"{r['rows']:>6} rows {r['bytes']:>9} B  legacy {r['legacy_us']:>10} us  "
+              f"loads[{r['backend']}] {r['loads_us']:>10} us  x{r['speedup']}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "json", "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Load benchmark: N coordinators refreshing against the local fake portal.
+
+Needs Home Assistant installed (the coordinators run on a real, minimal
+HomeAssistant core). Reports throughput, p50/p95/p99 refresh latency,
+portal requests per refresh and peak Python memory.
+
+    python benchmarks/bench_load.py --accounts 300 --rounds 5 --latency-ms 50 --json load.json
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from _loader import ROOT, load
+from fake_portal import FakePortal, add_arguments, config_from_args
+
+sys.path.insert(0, str(ROOT.parent))
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+async def run(args: argparse.Namespace) -> dict:
+    from homeassistant.core import HomeAssistant
+    from custom_components.umnyeseti.const import CONF_MAX_CONCURRENCY
+    from custom_components.umnyeseti.coordinator import UmnyeSetiCoordinator
+    from custom_components.umnyeseti.hub import async_get_hub
+
+    portal = FakePortal(config_from_args(args))
+    url = await portal.start()
+    transport = None
+    if args.replay:
+        # Same coordinators, but every response comes from the cassette instead of the fake portal.
+        transport = load("transport").ReplayTransport.load(args.replay, args.timing)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config.language = args.language
+        hub = async_get_hub(hass, {CONF_MAX_CONCURRENCY: args.concurrency})
+        coordinators = [
+            UmnyeSetiCoordinator(hass, {
+                "login": f"user{i}",
+                "password": portal.config.password,
+                "entry_id": f"bench{i}",
+                "version": "bench",
+                "base_url": url,
+                "transport": transport.fork() if transport is not None else None,
+            }, hub)
+            for i in range(args.accounts)
+        ]
+        for c in coordinators:
+            await c.async_restore()
+
+        latencies: list[float] = []
+        errors = 0
+
+        async def refresh(c: UmnyeSetiCoordinator) -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            await c.async_refresh()
+            latencies.append(time.perf_counter() - started)
+            if c.data is None or c.data.error:
+                errors += 1
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(refresh(c) for c in coordinators))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        client = {"bytes_received": 0, "bytes_wire": 0, "tls_handshakes": 0, "handshakes_avoided": 0,
+                  "connections_created": 0, "connections_reused": 0}
+        for c in coordinators:
+            for key in client:
+                client[key] += getattr(c.metrics, key)
+        for c in coordinators:
+            await c.async_close()
+        await portal.stop()
+        try:
+            await hass.async_stop(force=True)
+        except Exception:
+            pass
+
+    refreshes = len(latencies)
+    requests = sum(v for k, v in portal.counters.items() if k in ("fetch", "login_page", "login"))
+    return {
+        "benchmark": "load",
+        "params": {
+            "accounts": args.accounts,
+            "rounds": args.rounds,
+            "concurrency": args.concurrency,
+            "rows": args.rows,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "unauthorized_rate": args.unauthorized_rate,
+            "mutate": args.mutate,
+            "compress": args.compress,
+        },
+        "refreshes": refreshes,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(refreshes / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+        },
+        "requests_per_refresh": round(requests / refreshes, 3) if refreshes else 0.0,
+        "portal": dict(portal.counters),
+        "bytes_sent": portal.bytes_sent,
+        "client": client,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--language", default="ru")
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--replay", help="serve responses from a cassette (see cassette.py) instead of the fake portal")
+    parser.add_argument("--timing", type=float, default=1.0, help="scale for the recorded latencies when replaying")
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Micro-benchmark: rendering payment history dates on every refresh.
+
+Compares converting every activity date on every poll (the old _to_human
+path: parse, convert to local time, strftime) with the LRU-cached
+conversions in presentation.py, on accounts with long payment histories.
+Warm runs are what a coordinator sees from the second poll on.
+
+    python benchmarks/bench_mapping.py [--json results.json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from _loader import load, payload, with_history
+
+SIZES = (12, 120, 1200, 5000)
+TZ = ZoneInfo("Europe/Moscow")
+
+def _legacy_human(iso: str) -> str:
+    return datetime.fromisoformat(iso).astimezone(TZ).strftime("%d.%m.%Y, %H:%M")
+
+def _legacy(rows: list[dict], months: int) -> tuple[list, dict]:
+    pays = [{"date": _legacy_human(r["iso"]), "amount": r["amount"]} for r in rows]
+    totals: dict[str, float] = {}
+    for r in rows:
+        month = datetime.fromisoformat(r["iso"]).astimezone(TZ).strftime("%Y-%m")
+        if month not in totals:
+            if len(totals) >= months:
+                break
+            totals[month] = 0.0
+        totals[month] = round(totals[month] + r["amount"], 2)
+    return pays, totals
+
+def run(number: int) -> list[dict]:
+    pr = load("presentation")
+    base = payload()
+    results = []
+    for size in SIZES:
+        activities = with_history(base, size)["data"]["activities"]
+        rows = sorted(({"iso": a["d_oper"], "amount": float(a["n_value_1"])} for a in activities),
+                      key=lambda r: r["iso"], reverse=True)
+
+        def cached():
+            return pr.pays_view(rows, TZ), pr.monthly_totals(rows, TZ, 12)
+
+        assert cached() == _legacy(rows, 12)
+        row = {"rows": size}
+        row["legacy_us"] = round(min(timeit.repeat(lambda: _legacy(rows, 12), number=number, repeat=5)) / number * 1e6, 2)
+        pr.local_dt.cache_clear()
+        pr.human_dt.cache_clear()
+        cold = timeit.timeit(cached, number=1)
+        row["cold_us"] = round(cold * 1e6, 2)
+        row["warm_us"] = round(min(timeit.repeat(cached, number=number, repeat=5)) / number * 1e6, 2)
+        row["speedup"] = round(row["legacy_us"] / row["warm_us"], 2)
+        results.append(row)
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+    results = run(args.number)
+    for r in results:
+        print(f"{r['rows']:>6} rows  legacy {r['legacy_us']:>10} us  cold {r['cold_us']:>10} us  "
+              f"warm {r['warm_us']:>10} us  x{r['speedup']}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "mapping", "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
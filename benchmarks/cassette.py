@@ -0,0 +1,112 @@
+"""Record portal traffic to a cassette and profile the refresh path against it.
+
+record: logs in and fetches through UmnyeSetiApi with a RecordingTransport
+and writes the redacted exchange (login page, login POST, JSON payload,
+timings) to a cassette. Without --base-url it records the local fake portal.
+
+replay: runs fetch -> parse -> decode -> render from a cassette, with the
+original timings (--timing 1), scaled ones, or none (--timing 0), and
+reports per-phase latencies. No network is needed.
+
+    python benchmarks/cassette.py record --login LOGIN --password PASS --base-url https://stat.umnyeseti.ru --out incident.json
+    python benchmarks/cassette.py replay incident.json --rounds 200 --timing 0 --json replay.json
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from aiohttp import ClientSession, CookieJar
+
+from _loader import load
+from fake_portal import FakePortal, PortalConfig
+
+async def _refresh(api, login: str, password: str):
+    j = await api.fetch_json()
+    if isinstance(j, dict) and j.get("error") in ("unauthorized", "invalid_json"):
+        await api.auth(login, password)
+        j = await api.fetch_json()
+    return j
+
+async def record(args: argparse.Namespace) -> dict:
+    api_mod = load("api")
+    transport_mod = load("transport")
+    portal = None
+    base_url = args.base_url
+    password = args.password
+    if not base_url:
+        portal = FakePortal(PortalConfig(rows=args.rows))
+        base_url = await portal.start()
+        password = portal.config.password
+    async with ClientSession(cookie_jar=CookieJar(unsafe=True)) as session:
+        recorder = transport_mod.RecordingTransport(transport_mod.AiohttpTransport(session), redact=not args.no_redact)
+        api = api_mod.UmnyeSetiApi(session, base_url=base_url, transport=recorder)
+        for _ in range(args.rounds):
+            await _refresh(api, args.login, password)
+    if portal is not None:
+        await portal.stop()
+    recorder.save(args.out)
+    return {"cassette": args.out, "interactions": len(recorder.interactions)}
+
+async def replay(args: argparse.Namespace) -> dict:
+    api_mod = load("api")
+    transport_mod = load("transport")
+    metrics_mod = load("metrics")
+    model = load("model")
+    presentation = load("presentation")
+
+    transport = transport_mod.ReplayTransport.load(args.cassette, args.timing)
+    metrics = metrics_mod.RefreshMetrics()
+    api = api_mod.UmnyeSetiApi(None, base_url="http://replay.invalid", metrics=metrics, transport=transport)
+    tz = datetime.now().astimezone().tzinfo
+    errors = 0
+    for _ in range(args.rounds):
+        with metrics.phase("refresh"):
+            j = await _refresh(api, "replay", "replay")
+            raw = j.get("data") if isinstance(j, dict) else None
+            if not isinstance(raw, dict):
+                errors += 1
+                continue
+            with metrics.phase("map"):
+                acc = model.decode_account(raw)
+                history = model.PaymentHistory(raw.get("activities") or [])
+                presentation.Presenter().render(acc, history, args.language, tz, datetime.now(tz).date())
+        # Replays the same payload over and over; validators would turn every later fetch into a 304.
+        api.reset_validators()
+    result = metrics.as_dict()
+    result.update({"benchmark": "replay", "cassette": args.cassette, "rounds": args.rounds,
+                   "timing": args.timing, "errors": errors, "responses_served": transport.served})
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("--login", default="bench")
+    rec.add_argument("--password", default="")
+    rec.add_argument("--base-url", help="portal to record (default: the local fake portal)")
+    rec.add_argument("--rows", type=int, default=24, help="payment history rows served by the fake portal")
+    rec.add_argument("--rounds", type=int, default=1)
+    rec.add_argument("--no-redact", action="store_true")
+    rec.add_argument("--out", required=True)
+    rep = sub.add_parser("replay")
+    rep.add_argument("cassette")
+    rep.add_argument("--rounds", type=int, default=100)
+    rep.add_argument("--timing", type=float, default=0.0, help="1 = recorded latencies, 0 = none")
+    rep.add_argument("--language", default="ru")
+    rep.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+    if args.command == "record":
+        result = asyncio.run(record(args))
+    else:
+        result = asyncio.run(replay(args))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if getattr(args, "json_path", None):
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Local stand-in for stat.umnyeseti.ru.
+
+Serves the login page with an authenticity_token, the /login form POST and
+the JSON payload, with configurable latency, payload size, session lifetime
+and forced 401s. Run standalone to point an integration or the exporter at it:
+
+    python benchmarks/fake_portal.py --port 8089 --rows 200 --latency-ms 80
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from _loader import payload, with_history
+
+SESSION_COOKIE = "_stat_session"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Личный кабинет</title></head>
+<body>{padding}
+<form action="/login" method="post">
+<input name="utf8" type="hidden" value="&#x2713;" />
+<input type="hidden" name="authenticity_token" value="{token}" />
+<input type="text" name="user[login]" /><input type="password" name="user[password]" />
+</form>
+{error}{trailer}
+</body></html>"""
+
+@dataclass
+class PortalConfig:
+    rows: int = 24
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    unauthorized_rate: float = 0.0
+    unauthorized_mode: str = "html"  # "html": login page with 200, "401": bare 401
+    session_ttl: float = 1800.0
+    login_page_padding: int = 8 * 1024
+    login_page_trailer: int = 64 * 1024  # scripts and footer after the form
+    mutate: bool = False
+    compress: bool = False
+    password: str = "secret"
+
+class FakePortal:
+    def __init__(self, config: PortalConfig | None = None):
+        self.config = config or PortalConfig()
+        self.counters: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self._sessions: dict[str, float] = {}
+        self._tokens: set[str] = set()
+        self._base = payload()
+        self._body = self._render_payload()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    def _render_payload(self) -> bytes:
+        data = with_history(self._base, self.config.rows)
+        if self.config.mutate:
+            data["data"]["personal_accounts"][0]["n_sum_bal"] = round(random.uniform(0, 1000), 2)
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    async def _delay(self) -> None:
+        ms = self.config.latency_ms + random.uniform(0, self.config.jitter_ms)
+        if ms > 0:
+            await asyncio.sleep(ms / 1000)
+
+    def _session_valid(self, request: web.Request) -> bool:
+        sid = request.cookies.get(SESSION_COOKIE)
+        expires = self._sessions.get(sid or "")
+        return expires is not None and expires > time.monotonic()
+
+    def _login_page(self, error: str = "") -> web.Response:
+        token = secrets.token_urlsafe(32)
+        self._tokens.add(token)
+        body = LOGIN_PAGE.format(
+            padding="<!-- " + "x" * self.config.login_page_padding + " -->",
+            trailer="<!-- " + "y" * self.config.login_page_trailer + " -->",
+            token=token,
+            error=f'<div class="error_container">{error}</div>' if error else "").encode("utf-8")
+        self.bytes_sent += len(body)
+        return self._compressed(web.Response(body=body, content_type="text/html", charset="utf-8"))
+
+    def _compressed(self, resp: web.Response) -> web.Response:
+        # Honours Accept-Encoding like nginx with gzip on; bytes_sent stays the uncompressed size.
+        if self.config.compress:
+            resp.enable_compression()
+        return resp
+
+    async def handle_root(self, request: web.Request) -> web.Response:
+        await self._delay()
+        wants_json = request.headers.get("X-Requested-With") == "XMLHttpRequest"
+        if not wants_json:
+            self.counters["login_page"] += 1
+            return self._login_page()
+        self.counters["fetch"] += 1
+        forced = random.random() < self.config.unauthorized_rate
+        if forced or not self._session_valid(request):
+            self.counters["fetch_unauthorized"] += 1
+            if self.config.unauthorized_mode == "401":
+                return web.Response(status=401)
+            return self._login_page()
+        if self.config.mutate:
+            self._body = self._render_payload()
+        self.bytes_sent += len(self._body)
+        return self._compressed(web.Response(body=self._body, content_type="application/json"))
+
+    async def handle_login(self, request: web.Request) -> web.Response:
+        await self._delay()
+        self.counters["login"] += 1
+        form = await request.post()
+        token = form.get("authenticity_token")
+        if token not in self._tokens or form.get("user[password]") != self.config.password:
+            self.counters["login_failed"] += 1
+            return self._login_page("Неверный логин или пароль")
+        self._tokens.discard(token)
+        sid = secrets.token_hex(16)
+        self._sessions[sid] = time.monotonic() + self.config.session_ttl
+        resp = web.json_response({"success": True})
+        resp.set_cookie(SESSION_COOKIE, sid, httponly=True)
+        return resp
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self.handle_root)
+        app.router.add_post("/login", self.handle_login)
+        return app
+
+    async def start(self, host: str = "localhost", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        # Use a hostname: aiohttp's cookie jar ignores cookies set by bare IP addresses.
+        self.url = f"http://localhost:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rows", type=int, default=PortalConfig.rows, help="payment history rows in the payload")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0, help="share of fetches forced to fail auth")
+    parser.add_argument("--unauthorized-mode", choices=("html", "401"), default="html")
+    parser.add_argument("--session-ttl", type=float, default=PortalConfig.session_ttl)
+    parser.add_argument("--mutate", action="store_true", help="change the balance on every fetch")
+    parser.add_argument("--compress", action="store_true", help="compress responses the client accepts")
+
+def config_from_args(args: argparse.Namespace) -> PortalConfig:
+    return PortalConfig(
+        rows=args.rows,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        unauthorized_rate=args.unauthorized_rate,
+        unauthorized_mode=args.unauthorized_mode,
+        session_ttl=args.session_ttl,
+        mutate=args.mutate,
+        compress=args.compress)
+
+async def _serve(args: argparse.Namespace) -> None:
+    portal = FakePortal(config_from_args(args))
+    url = await portal.start(args.host, args.port)
+    print(f"fake portal listening on {url} (password: {portal.config.password})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await portal.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8089)
+    add_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,19 +1,43 @@
 from __future__ import annotations
+import voluptuous as vol
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import async_get_integration
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_RESPONSE_KB,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_RESPONSE_KB)
 from .coordinator import UmnyeSetiCoordinator
+from .hub import async_get_hub
+from .storage import async_remove_stores
+from .services import async_setup_services
 
 PLATFORMS = [Platform.SENSOR]
 
+CONFIG_SCHEMA = vol.Schema({
+    vol.Optional(DOMAIN): vol.Schema({
+        vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): vol.All(int, vol.Range(min=1)),
+        vol.Optional(CONF_MAX_RESPONSE_KB, default=DEFAULT_MAX_RESPONSE_KB): vol.All(int, vol.Range(min=64)),
+    }),
+}, extra=vol.ALLOW_EXTRA)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType):
+    async_get_hub(hass, config.get(DOMAIN))
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     integration = await async_get_integration(hass, entry.domain)
     version = integration.version
-    cfg = {**entry.data, **entry.options, "entry_id": entry.entry_id, "version": version}
-    coordinator = UmnyeSetiCoordinator(hass, cfg)
+    cfg = {**entry.data, **entry.options, "entry_id": entry.entry_id, "version": version, "title": entry.title}
+    hub = async_get_hub(hass)
+    coordinator = UmnyeSetiCoordinator(hass, cfg, hub)
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     integration = await async_get_integration(hass, DOMAIN)
@@ -21,8 +45,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     entry.async_on_unload(entry.add_update_listener(async_options_updated))
 
-    await coordinator.async_config_entry_first_refresh()
+    await coordinator.async_restore()
+    restored = coordinator.data is not None
+    if not restored:
+        # First install or wiped storage: nothing to show yet, so setup waits for (and fails with) the portal.
+        try:
+            await coordinator.async_config_entry_first_refresh()
+            if coordinator.data is None or coordinator.data.error:
+                raise ConfigEntryNotReady(coordinator.data.error if coordinator.data else "no_data")
+        except Exception:
+            hass.data[DOMAIN].pop(entry.entry_id, None)
+            await coordinator.async_close()
+            raise
+    coordinator.async_track_local_time()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # With a restored snapshot entities come up from it and the first real refresh runs in the background.
+    hub.async_register(coordinator, refresh_now=restored)
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -34,3 +72,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
 
 async def async_options_updated(hass: HomeAssistant, entry: ConfigEntry):
     await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    await async_remove_stores(hass, entry.entry_id)
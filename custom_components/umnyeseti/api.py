@@ -1,10 +1,101 @@
 from __future__ import annotations
+import hashlib
+from contextlib import nullcontext
 from typing import Optional
-from aiohttp import ClientSession, ClientTimeout
+from aiohttp import ClientSession
 from .const import INIT_URL, AUTH_URL, USER_AGENT_TEMPLATE
+from .transport import AiohttpTransport, Transport
+from .timeouts import AdaptiveTimeouts
 import re, json as _json
 
-DEFAULT_TIMEOUT = ClientTimeout(total=15)
+try:
+    import orjson as _fast_json
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    _fast_json = None
+
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:  # pragma: no cover
+    HAS_BROTLI = False
+
+JSON_MAX_BYTES = 2 * 1024 * 1024
+
+# Only advertise what aiohttp can decode here; br needs Brotli or brotlicffi.
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+LOGIN_PAGE_MAX_BYTES = 256 * 1024
+LOGIN_PAGE_CHUNK = 8 * 1024
+LOGIN_PAGE_OVERLAP = 1024  # longest <input> tag we expect to straddle two chunks
+# Reading this much more to keep the connection alive is cheaper than a new handshake; beyond it, drop the connection.
+DRAIN_MAX_BYTES = 4 * 1024
+
+_TOKEN_RE = re.compile(rb'<input[^>]+name=["\']authenticity_token["\'][^>]+value=["\']([^"\']+)["\']', re.I)
+_ERROR_RE = re.compile(r'<div\s+class=["\']error_container["\']\s*>(.*?)</div>', re.I | re.S)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+async def _scan_token(content, max_bytes: int = LOGIN_PAGE_MAX_BYTES) -> tuple[Optional[str], int]:
+    buf = b""
+    total = 0
+    async for chunk in content.iter_chunked(LOGIN_PAGE_CHUNK):
+        total += len(chunk)
+        buf = buf[-LOGIN_PAGE_OVERLAP:] + chunk
+        m = _TOKEN_RE.search(buf)
+        if m:
+            return m.group(1).decode("utf-8", "replace"), total
+        if total >= max_bytes:
+            break
+    return None, total
+
+def loads(body: bytes):
+    if _fast_json is not None:
+        return _fast_json.loads(body)
+    return _json.loads(body)
+
+async def _read_capped(resp, max_bytes: int) -> Optional[bytes]:
+    if resp.content_length is not None and resp.content_length > max_bytes:
+        return None
+    parts = []
+    total = 0
+    while chunk := await resp.content.readany():
+        total += len(chunk)
+        if total > max_bytes:
+            return None
+        parts.append(chunk)
+    return b"".join(parts)
+
+def _remaining(resp, decoded: int) -> Optional[int]:
+    # Bytes still on the wire, when Content-Length says; None when there is no telling.
+    if resp.content_length is None:
+        return None
+    raw = getattr(resp.content, "total_raw_bytes", None)
+    if not isinstance(raw, int):
+        if resp.headers.get("Content-Encoding"):
+            return None
+        raw = decoded
+    return max(resp.content_length - raw, 0)
+
+async def _release(resp, read: int = 0) -> int:
+    # Drain a small unread remainder so the connection goes back to the pool; otherwise close it
+    # instead of downloading the rest. Returns the bytes read including the drained ones.
+    left = _remaining(resp, read)
+    if left is not None and left <= DRAIN_MAX_BYTES:
+        drained = 0
+        while drained <= DRAIN_MAX_BYTES and (chunk := await resp.content.readany()):
+            drained += len(chunk)
+        if drained <= DRAIN_MAX_BYTES:
+            return read + drained
+        read += drained
+    resp.close()
+    return read
+
+def _wire_bytes(resp, decoded: int) -> int:
+    # aiohttp >= 3.12 counts compressed bytes itself; before that only Content-Length tells.
+    raw = getattr(resp.content, "total_raw_bytes", None)
+    if isinstance(raw, int) and raw:
+        return raw
+    if resp.headers.get("Content-Encoding") and resp.content_length is not None:
+        return resp.content_length
+    return decoded
 
 class UmnyeSetiApi:
     def _read_version_from_manifest(self) -> str:
@@ -22,6 +113,7 @@ class UmnyeSetiApi:
     def _headers_form(self) -> dict:
             return {
                 'User-Agent': self.user_agent,
+                'Accept-Encoding': ACCEPT_ENCODING,
                 'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
                 'Accept': 'application/json',
                 'X-Requested-With': 'XMLHttpRequest',
@@ -33,6 +125,7 @@ class UmnyeSetiApi:
     def _headers_json(self) -> dict:
             return {
                 'User-Agent': self.user_agent,
+                'Accept-Encoding': ACCEPT_ENCODING,
                 'Accept': 'application/json',
                 'X-Requested-With': 'XMLHttpRequest',
                 'Cache-Control': 'no-cache',
@@ -43,6 +136,7 @@ class UmnyeSetiApi:
     def _headers_html(self) -> dict:
             return {
                 'User-Agent': self.user_agent,
+                'Accept-Encoding': ACCEPT_ENCODING,
                 'Cache-Control': 'no-cache',
                 'Pragma': 'no-cache',
                 'Expires': '0',
@@ -51,12 +145,26 @@ class UmnyeSetiApi:
 
 
 
-    def __init__(self, session: ClientSession, *, verify_ssl: bool = True, on_cookies=None, version: str = "0.0.0"):
+    def __init__(self, session: ClientSession, *, verify_ssl: bool = True, on_cookies=None, version: str = "0.0.0",
+                 max_body_bytes: int = JSON_MAX_BYTES, base_url: str = INIT_URL, metrics=None,
+                 transport: Optional[Transport] = None, timeouts: Optional[AdaptiveTimeouts] = None,
+                 conditional: bool = True):
         self._session = session
+        # Only worth it for callers that keep the previous payload to serve on 304.
+        self._conditional = conditional
+        self.last_digest: Optional[str] = None
+        self.timeouts = timeouts or AdaptiveTimeouts(metrics)
+        self._transport: Transport = transport or AiohttpTransport(session)
+        self._metrics = metrics
+        self._init_url = base_url
+        self._auth_url = AUTH_URL if base_url == INIT_URL else f"{base_url.rstrip('/')}/login"
+        self._max_body_bytes = max_body_bytes
         self._verify_ssl = verify_ssl
         self._version = version
         self._last_error: Optional[str] = None
         self._on_cookies = on_cookies
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
 
     @property
     def last_error(self) -> Optional[str]:
@@ -69,6 +177,13 @@ class UmnyeSetiApi:
         except Exception:
             return USER_AGENT_TEMPLATE.format(version='0.0.0')
 
+    def _phase(self, name: str):
+        return self._metrics.phase(name) if self._metrics is not None else nullcontext()
+
+    def _count_bytes(self, n: int, wire: Optional[int] = None):
+        if self._metrics is not None:
+            self._metrics.add_bytes(n, wire)
+
     async def _persist(self):
         if callable(self._on_cookies):
             try:
@@ -78,33 +193,44 @@ class UmnyeSetiApi:
 
     async def auth(self, login: str, password: str):
         self._last_error = None
-        async with self._session.get(
-            INIT_URL,
-            headers=self._headers_html(),
-            ssl=self._verify_ssl,
-            timeout=DEFAULT_TIMEOUT,
-        ) as resp:
-            html = await resp.text()
-
-        m = re.search(r'<input[^>]+name=["\']authenticity_token["\'][^>]+value=["\']([^"\']+)["\']', html, re.I)
-        if not m:
+        with self._phase("login_page"):
+            async with self._transport.request(
+                "GET",
+                self._init_url,
+                headers=self._headers_html(),
+                ssl=self._verify_ssl,
+                timeout=self.timeouts.get("login_page"),
+                trace_request_ctx={"kind": "login_page"},
+            ) as resp:
+                token, read = await _scan_token(resp.content)
+                read = await _release(resp, read)
+                wire = _wire_bytes(resp, read)
+        self._count_bytes(read, wire)
+
+        if not token:
             self._last_error = "init_token_not_found"
             return {"error": "auth_failed", "message": "init_token_not_found"}
 
         form = {
             "user[login]": login,
             "user[password]": password,
-            "authenticity_token": m.group(1),
+            "authenticity_token": token,
             "utf8": "&#x2713;",
             "commit": "Войти",
         }
-        async with self._session.post(
-            AUTH_URL,
-            headers=self._headers_form(), 
-            ssl=self._verify_ssl,
-            data=form,
-            timeout=DEFAULT_TIMEOUT) as resp:
-            text = await resp.text()
+        with self._phase("login_post"):
+            async with self._transport.request(
+                "POST",
+                self._auth_url,
+                headers=self._headers_form(),
+                ssl=self._verify_ssl,
+                data=form,
+                timeout=self.timeouts.get("login_post"),
+                trace_request_ctx={"kind": "login_post"}) as resp:
+                raw = await resp.read()
+                text = raw.decode(resp.get_encoding(), "replace")
+                wire = _wire_bytes(resp, len(raw))
+        self._count_bytes(len(raw), wire)
 
         await self._persist()
 
@@ -113,33 +239,81 @@ class UmnyeSetiApi:
         except Exception:
             pass
 
-        m = re.search(r'<div\s+class=["\']error_container["\']\s*>(.*?)</div>', text, re.I | re.S)
+        m = _ERROR_RE.search(text)
         if m:
-            import re as _re
-            msg_raw = m.group(1)
-            msg = _re.sub(r'<[^>]+>', '', msg_raw).strip()
+            msg = _TAG_RE.sub('', m.group(1)).strip()
             self._last_error = "auth_failed"
             return {"error": "auth_failed", "message": msg}
 
         self._last_error = "auth_failed"
         return {"error": "auth_failed", "message": ""}
 
+    def reset_validators(self):
+        self._etag = None
+        self._last_modified = None
+
+    def _headers_conditional(self) -> dict:
+        headers = self._headers_json()
+        if not self._conditional:
+            return headers
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+        return headers
+
     async def fetch_json(self):
         self._last_error = None
-        async with self._session.get(
-            INIT_URL,
-            headers=self._headers_json(),
-            ssl=self._verify_ssl,
-            timeout=DEFAULT_TIMEOUT,
-        ) as resp:
-            text = await resp.text()
-            if resp.status == 401:
-                return {"error": "unauthorized"}
+        with self._phase("fetch"):
+            async with self._transport.request(
+                "GET",
+                self._init_url,
+                headers=self._headers_conditional(),
+                ssl=self._verify_ssl,
+                timeout=self.timeouts.get("fetch"),
+                trace_request_ctx={"kind": "fetch"},
+            ) as resp:
+                if resp.status == 304:
+                    return {"status": "not_modified"}
+                if resp.status == 401:
+                    self.reset_validators()
+                    self._count_bytes(await _release(resp))
+                    return {"error": "unauthorized"}
+                if resp.status >= 500:
+                    self._last_error = "server_error"
+                    self._count_bytes(await _release(resp))
+                    return {"error": "server_error", "status": resp.status}
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+                # An expired session is answered with the HTML login page; don't bother parsing it.
+                is_html = 'html' in resp.content_type
+                if is_html:
+                    body = None
+                    self._count_bytes(await _release(resp))
+                else:
+                    body = await _read_capped(resp, self._max_body_bytes)
+                if body is not None:
+                    wire = _wire_bytes(resp, len(body))
+        if body is not None:
+            self._count_bytes(len(body), wire)
 
         await self._persist()
 
+        if body is None and not is_html:
+            self.reset_validators()
+            self._last_error = "response_too_large"
+            return {"error": "response_too_large"}
+
         try:
-            return _json.loads(text)
+            if body is None:
+                raise ValueError("html response")
+            with self._phase("parse"):
+                j = loads(body)
+                # Digest of the raw bytes: far cheaper than re-serialising the parsed payload to compare it.
+                self.last_digest = hashlib.blake2b(body, digest_size=16).hexdigest()
         except Exception:
+            self.reset_validators()
             self._last_error = "invalid_json"
             return {"error": "invalid_json"}
+        self._etag, self._last_modified = etag, last_modified
+        return j
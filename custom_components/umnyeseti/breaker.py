@@ -0,0 +1,125 @@
+from __future__ import annotations
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_BASE_BACKOFF,
+    BREAKER_MAX_BACKOFF,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_MIN_PER_SEC,
+    RETRY_BUDGET_WINDOW)
+
+_LOGGER = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class RetryBudget:
+    # Retries may add at most `ratio` of the recent request volume, plus a small fixed reserve.
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_per_sec: float = RETRY_BUDGET_MIN_PER_SEC,
+                 window: float = RETRY_BUDGET_WINDOW):
+        self._ratio = ratio
+        self._reserve = min_per_sec * window
+        self._window = window
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _trim(self, now: float) -> None:
+        for q in (self._requests, self._retries):
+            while q and q[0] < now - self._window:
+                q.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self._reserve + self._ratio * len(self._requests):
+            return False
+        self._retries.append(now)
+        return True
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 base_backoff: float = BREAKER_BASE_BACKOFF, max_backoff: float = BREAKER_MAX_BACKOFF):
+        self.name = name
+        self.state = CLOSED
+        self.retry_budget = RetryBudget()
+        self._failure_threshold = failure_threshold
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._probe_inflight = False
+
+    @property
+    def open_until(self) -> float:
+        return self._open_until
+
+    @property
+    def is_open(self) -> bool:
+        # Side-effect free check for callers about to queue; allow() is what actually admits a request.
+        return self.state == OPEN and time.monotonic() < self._open_until
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() < self._open_until:
+                return False
+            self.state = HALF_OPEN
+            self._probe_inflight = False
+        # Half-open: exactly one caller probes the portal, everybody else keeps waiting.
+        if self._probe_inflight:
+            return False
+        self._probe_inflight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            _LOGGER.info("%s: portal recovered, closing circuit", self.name)
+        self.state = CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._probe_inflight = False
+
+    def record_skipped(self) -> None:
+        # The caller gave up on its own (e.g. retry budget); says nothing about the portal, but frees the probe.
+        self._probe_inflight = False
+
+    @contextmanager
+    def release_on_error(self):
+        # Wraps an admitted request: if it dies without an outcome (e.g. cancelled on unload), the half-open
+        # probe must not stay taken, or every entry on this host stops polling.
+        try:
+            yield
+        except BaseException:
+            self.record_skipped()
+            raise
+
+    def record_failure(self) -> None:
+        if self.state == OPEN:
+            # Requests admitted before the circuit opened are part of the same outage, not another trip.
+            return
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self._failure_threshold:
+            self._trip()
+
+    def _trip(self) -> None:
+        self._trips += 1
+        # Exponential backoff with equal jitter: half of the current cap is fixed, the other half random,
+        # so hosts recovering at once spread out without ever retrying almost immediately.
+        cap = min(self._max_backoff, self._base_backoff * (2 ** (self._trips - 1)))
+        backoff = cap / 2 + random.uniform(0, cap / 2)
+        if self.state != OPEN:
+            _LOGGER.warning("%s: portal unavailable, pausing requests for %.0f s", self.name, backoff)
+        self.state = OPEN
+        self._open_until = time.monotonic() + backoff
+        self._probe_inflight = False
@@ -2,7 +2,8 @@ from __future__ import annotations
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.loader import async_get_integration
+from yarl import URL
 
 from .const import (
     DOMAIN,
@@ -10,10 +11,20 @@ from .const import (
     CONF_PASSWORD,
     CONF_VERIFY_SSL,
     CONF_UPDATE_INTERVAL,
+    CONF_ADAPTIVE,
+    CONF_MIN_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_TIMEOUT_CONNECT,
+    CONF_TIMEOUT_READ,
+    CONF_TIMEOUT_TOTAL,
+    TIMEOUT_MAX_TOTAL,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
     MIN_UPDATE_INTERVAL,
+    INIT_URL,
 )
 from .api import UmnyeSetiApi
+from .hub import async_get_hub
 
 def _coerce_int(v, default):
     try:
@@ -41,13 +52,22 @@ class UmnyeSetiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ui = dict(user_input)
             ui[CONF_UPDATE_INTERVAL] = max(_coerce_int(ui.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL), DEFAULT_UPDATE_INTERVAL), MIN_UPDATE_INTERVAL)
 
+            await self.async_set_unique_id(f"login:{ui[CONF_LOGIN]}")
+            self._abort_if_unique_id_configured()
+
+            # Same pool, jar type and User-Agent as the coordinator, so the session can be handed over.
+            hub = async_get_hub(self.hass)
+            session = hub.create_session(ui.get(CONF_VERIFY_SSL, True))
             try:
-                session = async_create_clientsession(self.hass, verify_ssl=ui.get(CONF_VERIFY_SSL, True))
-                api = UmnyeSetiApi(session, verify_ssl=ui.get(CONF_VERIFY_SSL, True))
+                integration = await async_get_integration(self.hass, DOMAIN)
+                api = UmnyeSetiApi(session, verify_ssl=ui.get(CONF_VERIFY_SSL, True), version=str(integration.version or "0.0.0"))
                 auth_resp = await api.auth(ui[CONF_LOGIN], ui[CONF_PASSWORD])
+                cookies = {k: v.value for k, v in session.cookie_jar.filter_cookies(URL(INIT_URL)).items()}
             except Exception:
                 errors["base"] = "cannot_connect"
                 return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
+            finally:
+                await session.close()
 
             if not auth_resp or (isinstance(auth_resp, dict) and auth_resp.get("error") in ("auth_failed", "unauthorized")):
                 errors["base"] = "auth_failed"
@@ -57,8 +77,8 @@ class UmnyeSetiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 placeholders = {"reason": reason}
                 return self.async_show_form(step_id="user", data_schema=schema, errors=errors, description_placeholders=placeholders)
 
-            await self.async_set_unique_id(f"login:{ui[CONF_LOGIN]}")
-            self._abort_if_unique_id_configured()
+            if cookies:
+                hub.stash_login(ui[CONF_LOGIN], cookies)
             return self.async_create_entry(title=f"Умные Сети ({ui[CONF_LOGIN]})", data=ui)
 
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors, description_placeholders=placeholders)
@@ -70,16 +90,33 @@ class UmnyeSetiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
 class UmnyeSetiOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
     async def async_step_init(self, user_input=None):
+        errors = {}
+        opts = self.config_entry.options or {}
         if user_input is not None:
             ui = dict(user_input)
             current = self.config_entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
             ui[CONF_UPDATE_INTERVAL] = max(_coerce_int(ui.get(CONF_UPDATE_INTERVAL, current), current), MIN_UPDATE_INTERVAL)
             ui[CONF_VERIFY_SSL] = bool(ui.get(CONF_VERIFY_SSL, self.config_entry.options.get(CONF_VERIFY_SSL, True)))
-            return self.async_create_entry(title="Options", data=ui)
+            ui[CONF_ADAPTIVE] = bool(ui.get(CONF_ADAPTIVE, False))
+            ui[CONF_MIN_INTERVAL] = max(_coerce_int(ui.get(CONF_MIN_INTERVAL, MIN_UPDATE_INTERVAL), MIN_UPDATE_INTERVAL), MIN_UPDATE_INTERVAL)
+            ui[CONF_MAX_INTERVAL] = _coerce_int(ui.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL), DEFAULT_MAX_INTERVAL)
+            for key in (CONF_TIMEOUT_CONNECT, CONF_TIMEOUT_READ, CONF_TIMEOUT_TOTAL):
+                ui[key] = min(max(_coerce_int(ui.get(key, 0), 0), 0), TIMEOUT_MAX_TOTAL)
+            if ui[CONF_MAX_INTERVAL] < ui[CONF_MIN_INTERVAL]:
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                return self.async_create_entry(title="Options", data=ui)
+            opts = ui
 
-        opts = self.config_entry.options or {}
         schema = vol.Schema({
             vol.Optional(CONF_UPDATE_INTERVAL, default=_coerce_int(opts.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL), DEFAULT_UPDATE_INTERVAL)): vol.All(int, vol.Range(min=MIN_UPDATE_INTERVAL)),
             vol.Optional(CONF_VERIFY_SSL, default=bool(opts.get(CONF_VERIFY_SSL, True))): bool,
+            vol.Optional(CONF_ADAPTIVE, default=bool(opts.get(CONF_ADAPTIVE, False))): bool,
+            vol.Optional(CONF_MIN_INTERVAL, default=_coerce_int(opts.get(CONF_MIN_INTERVAL, MIN_UPDATE_INTERVAL), MIN_UPDATE_INTERVAL)): vol.All(int, vol.Range(min=MIN_UPDATE_INTERVAL)),
+            vol.Optional(CONF_MAX_INTERVAL, default=_coerce_int(opts.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL), DEFAULT_MAX_INTERVAL)): vol.All(int, vol.Range(min=MIN_UPDATE_INTERVAL)),
+            # 0 = learned from this account's own latencies.
+            vol.Optional(CONF_TIMEOUT_CONNECT, default=_coerce_int(opts.get(CONF_TIMEOUT_CONNECT, 0), 0)): vol.All(int, vol.Range(min=0, max=TIMEOUT_MAX_TOTAL)),
+            vol.Optional(CONF_TIMEOUT_READ, default=_coerce_int(opts.get(CONF_TIMEOUT_READ, 0), 0)): vol.All(int, vol.Range(min=0, max=TIMEOUT_MAX_TOTAL)),
+            vol.Optional(CONF_TIMEOUT_TOTAL, default=_coerce_int(opts.get(CONF_TIMEOUT_TOTAL, 0), 0)): vol.All(int, vol.Range(min=0, max=TIMEOUT_MAX_TOTAL)),
         })
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -6,9 +6,74 @@ CONF_LOGIN = "login"
 CONF_PASSWORD = "password"
 CONF_VERIFY_SSL = "verify_ssl"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_ADAPTIVE = "adaptive"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_MAX_RESPONSE_KB = "max_response_kb"
+CONF_TIMEOUT_CONNECT = "timeout_connect"
+CONF_TIMEOUT_READ = "timeout_read"
+CONF_TIMEOUT_TOTAL = "timeout_total"
 
 DEFAULT_UPDATE_INTERVAL = 15  # minutes
 MIN_UPDATE_INTERVAL = 15
+DEFAULT_MAX_INTERVAL = 360  # minutes, adaptive mode ceiling
+
+ADAPTIVE_RENEWAL_DAYS = 2  # poll at the floor this close to the subscription end
+ADAPTIVE_RECENT_CHANGE = 3600  # seconds at the floor after a balance change or payment
+
+DEFAULT_MAX_CONCURRENCY = 4  # in-flight requests across all accounts
+DEFAULT_MAX_RESPONSE_KB = 2048  # cap for the JSON payload body
+SCHEDULE_JITTER = 0.05  # fraction of update_interval
+
+PAYMENTS_WINDOW = 10  # payments shown in the sensor attributes
+PAYMENTS_MONTHS = 12  # monthly totals shown in the sensor attributes
+LEDGER_SAVE_DELAY = 10  # seconds
+LOCAL_DT_CACHE_SIZE = 8192  # ISO timestamps kept converted to local time (shared by all entries)
+COOKIE_SAVE_DELAY = 30  # seconds
+SNAPSHOT_SAVE_DELAY = 60  # seconds
+EVENTS_SAVE_DELAY = 5  # seconds
+STARTUP_STAGGER_WINDOW = 120  # seconds over which first refreshes after startup are spread
+# Provider connection profile. Polls of one account are >= 15 min apart, far past any server idle timeout, so
+# keep-alive only has to bridge login page -> login POST -> JSON fetch and neighbouring accounts in the stagger.
+CONNECTOR_KEEPALIVE = 75  # seconds, nginx's default idle timeout
+CONNECTOR_DNS_TTL = 600  # seconds
+
+SERVICE_REFRESH = "refresh"
+ATTR_ENTRY_ID = "entry_id"
+REFRESH_ALL = "all"
+SERVICE_REFRESH_MIN_GAP = 60  # seconds since an entry's last refresh before the service polls it again
+
+BREAKER_FAILURE_THRESHOLD = 3  # consecutive outage failures before the circuit opens
+BREAKER_BASE_BACKOFF = 60  # seconds
+BREAKER_MAX_BACKOFF = 1800  # seconds
+RETRY_BUDGET_RATIO = 0.2  # share of recent requests that may be re-auth retries
+RETRY_BUDGET_MIN_PER_SEC = 0.1
+RETRY_BUDGET_WINDOW = 600  # seconds
+
+METRICS_WINDOW = 100  # samples kept per timing histogram
+
+# HTTP budgets: defaults until enough samples exist, then percentile * safety factor within the bounds.
+TIMEOUT_DEFAULT_CONNECT = 10  # seconds
+TIMEOUT_DEFAULT_READ = 15  # seconds
+TIMEOUT_DEFAULT_TOTAL = 15  # seconds
+TIMEOUT_MIN_SAMPLES = 5
+TIMEOUT_PERCENTILE = 95
+TIMEOUT_SAFETY_FACTOR = 4.0
+TIMEOUT_MIN_CONNECT = 2  # seconds
+TIMEOUT_MIN_TOTAL = 5  # seconds
+TIMEOUT_MAX_TOTAL = 60  # seconds
+
+SESSION_RENEW_MARGIN = 120  # seconds before the session expires
+SESSION_MIN_TTL = 60  # seconds
+SESSION_TTL_ALPHA = 0.3  # EWMA weight of a newly observed session lifetime
+ONBOARDING_HANDOFF_TTL = 600  # seconds a config-flow login stays usable by the new entry
+
+EVENT_PAYMENT_RECEIVED = f"{DOMAIN}_payment_received"
+EVENT_BALANCE_LOW = f"{DOMAIN}_balance_low"
+EVENT_TARIFF_CHANGED = f"{DOMAIN}_tariff_changed"
+EVENT_RENEWAL_DUE = f"{DOMAIN}_renewal_due"
+EVENT_RENEWAL_DAYS = 3  # renewal_due fires this many days before the subscription end
 
 INIT_URL = "https://stat.umnyeseti.ru"
 AUTH_URL = "https://stat.umnyeseti.ru/login"
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import json
+import logging
+import os
+from typing import Optional
+
+from aiohttp import ClientSession
+from yarl import URL
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, INIT_URL, COOKIE_SAVE_DELAY
+from .storage import EntryStore
+
+_LOGGER = logging.getLogger(__name__)
+
+class CookieStore(EntryStore):
+    def __init__(self, hass: HomeAssistant, entry_id: str, session: ClientSession, base_url: str = INIT_URL):
+        super().__init__(hass, "cookies", entry_id, COOKIE_SAVE_DELAY)
+        self._session = session
+        self._url = URL(base_url)
+        self._legacy_path = hass.config.path(f".storage/umnyeseti_cookies_{entry_id}.json")
+        self._persisted: Optional[dict[str, str]] = None
+
+    def snapshot(self) -> dict[str, str]:
+        return {k: v.value for k, v in self._session.cookie_jar.filter_cookies(self._url).items()}
+
+    async def async_load(self) -> None:
+        data = await self._async_read()
+        try:
+            cookies = (data or {}).get("cookies")
+            if cookies is None:
+                cookies = await self.hass.async_add_executor_job(self._read_legacy)
+                if cookies:
+                    self._mark_dirty()
+            if isinstance(cookies, dict) and cookies:
+                self._session.cookie_jar.update_cookies(cookies, response_url=self._url)
+            self._persisted = dict(cookies or {})
+        except Exception as e:
+            _LOGGER.debug("%s: failed to load cookies: %s", DOMAIN, e)
+
+    @callback
+    def async_seed(self, cookies: dict[str, str]) -> None:
+        self._session.cookie_jar.update_cookies(cookies, response_url=self._url)
+        self.async_schedule_save()
+
+    def _read_legacy(self) -> Optional[dict]:
+        # Pre-Store format: a bare JSON dict next to the HA storage files.
+        if not os.path.exists(self._legacy_path):
+            return None
+        with open(self._legacy_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        os.remove(self._legacy_path)
+        return data if isinstance(data, dict) else None
+
+    def _payload(self) -> dict:
+        return {"cookies": self._persisted or {}}
+
+    @callback
+    def async_schedule_save(self) -> None:
+        try:
+            cookies = self.snapshot()
+        except Exception as e:
+            _LOGGER.debug("%s: failed to snapshot cookies: %s", DOMAIN, e)
+            return
+        if cookies == self._persisted:
+            return
+        self._persisted = cookies
+        self._mark_dirty()
+
+    async def async_flush(self) -> None:
+        self.async_schedule_save()
+        await super().async_flush()
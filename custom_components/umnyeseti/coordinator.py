@@ -1,19 +1,33 @@
 from __future__ import annotations
-import json
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, replace
 from datetime import timedelta
 from typing import Optional
 
 from aiohttp import ClientSession
-from yarl import URL
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE, Event, callback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 from homeassistant.util import dt as dt_util
 from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 from .api import UmnyeSetiApi
+from .hub import UmnyeSetiHub
+from .diff import flatten_state, changed_keys
+from .ledger import PaymentLedger
+from .session import SessionManager
+from .cookies import CookieStore
+from .schedule import AdaptivePolicy
+from .metrics import RefreshMetrics
+from .timeouts import AdaptiveTimeouts
+from .snapshot import StateSnapshot
+from .model import Account, decode_account
+from .presentation import Presenter
+from .statistics import StatisticsImporter
+from .events import EventEmitter
 from .const import (
     DOMAIN,
     DEFAULT_UPDATE_INTERVAL,
@@ -22,78 +36,174 @@ from .const import (
     CONF_PASSWORD,
     CONF_VERIFY_SSL,
     CONF_UPDATE_INTERVAL,
-    INIT_URL)
+    CONF_ADAPTIVE,
+    INIT_URL,
+    CONF_MIN_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_TIMEOUT_CONNECT,
+    CONF_TIMEOUT_READ,
+    CONF_TIMEOUT_TOTAL,
+    DEFAULT_MAX_INTERVAL)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Errors that mean the portal itself is unreachable or failing (as opposed to this account's problem).
+_OUTAGE_ERRORS = (
+    "fetch_exception",
+    "fetch_after_auth_exception",
+    "auth_exception",
+    "errors: server_error",
+    "invalid_response")
+
 @dataclass
 class UmnyeSetiState:
     data: dict | None
     error: str | None
     last_attempt: str | None
+    stale: bool = False  # restored from the snapshot, not confirmed by the portal yet
 
 class UmnyeSetiCoordinator(DataUpdateCoordinator[UmnyeSetiState]):
-    def __init__(self, hass: HomeAssistant, config: dict):
+    def __init__(self, hass: HomeAssistant, config: dict, hub: UmnyeSetiHub):
         self.hass = hass
+        self.hub = hub
         self._version: str = str(config.get("version") or "0.0.0")
         self._login: str = config[CONF_LOGIN]
         self._password: str = config[CONF_PASSWORD]
         self._verify_ssl: bool = config.get(CONF_VERIFY_SSL, True)
         self._entry_id: str = config.get("entry_id", "default")
+        # Only overridden by the benchmarks, which point the integration at a local stand-in portal
+        # or at a recorded cassette (config["transport"]).
+        self._base_url: str = config.get("base_url") or INIT_URL
+        self._fingerprint: Optional[str] = None
+        # Canonical model of the last payload; state.data is its rendering for the current language/date/zone.
+        self.model: Optional[Account] = None
+        self.presenter = Presenter()
+        self._unsub_local: list[CALLBACK_TYPE] = []
+        self._flat: dict = {}
+        # Keys of the flattened state that differ from the previous update; None means "everything".
+        self.changed: Optional[frozenset[str]] = None
 
         interval_min = int(config.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL) or DEFAULT_UPDATE_INTERVAL)
         interval_min = max(interval_min, MIN_UPDATE_INTERVAL)
 
-        self._cookie_url = URL(INIT_URL)
-        self._cookie_path = hass.config.path(f".storage/umnyeseti_cookies_{self._entry_id}.json")
-
-        session: ClientSession = async_create_clientsession(hass, verify_ssl=self._verify_ssl)
+        self.metrics = RefreshMetrics()
+        session: ClientSession = hub.create_session(self._verify_ssl, trace_configs=[self.metrics.trace_config()])
         self.session = session
 
-        async def persist():
-            await self._save_cookies()
+        self.cookie_store = CookieStore(hass, self._entry_id, session, self._base_url)
 
-        self.api = UmnyeSetiApi(session, verify_ssl=self._verify_ssl, on_cookies=persist, version=self._version)
+        async def persist():
+            self.cookie_store.async_schedule_save()
+
+        self.ledger = PaymentLedger(hass, self._entry_id)
+        self.snapshot = StateSnapshot(hass, self._entry_id)
+        self.statistics = StatisticsImporter(hass, self._login, config.get("title") or self._login)
+        self._new_rows: list[dict] = []
+        self.events = EventEmitter(hass, self._entry_id, config.get("title") or self._login)
+
+        self.api = UmnyeSetiApi(
+            session, verify_ssl=self._verify_ssl, on_cookies=persist, version=self._version,
+            max_body_bytes=hub.max_body_bytes, base_url=self._base_url, metrics=self.metrics,
+            transport=config.get("transport"),
+            timeouts=AdaptiveTimeouts(
+                self.metrics, config.get(CONF_TIMEOUT_CONNECT), config.get(CONF_TIMEOUT_READ), config.get(CONF_TIMEOUT_TOTAL)))
+        self.session_manager = SessionManager(
+            hass, session, self.api, self._login, self._password, slot=hub.slot, name=self._entry_id,
+            breaker=hub.breaker(self._base_url), metrics=self.metrics)
+
+        # Polling is driven by the hub so that all accounts share one staggered schedule.
+        self.interval = timedelta(minutes=interval_min)
+        self.adaptive: Optional[AdaptivePolicy] = None
+        if config.get(CONF_ADAPTIVE):
+            floor_min = max(int(config.get(CONF_MIN_INTERVAL) or MIN_UPDATE_INTERVAL), MIN_UPDATE_INTERVAL)
+            ceiling_min = max(int(config.get(CONF_MAX_INTERVAL) or DEFAULT_MAX_INTERVAL), floor_min)
+            self.adaptive = AdaptivePolicy(timedelta(minutes=floor_min), timedelta(minutes=ceiling_min))
+        self._new_payments = 0
 
         super().__init__(
             hass,
             logger=_LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=interval_min))
-
-    async def async_config_entry_first_refresh(self) -> None:
-        await self._load_cookies()
-        await super().async_config_entry_first_refresh()
-
-    async def async_close(self):
-        try:
-            await self._save_cookies()
-        except Exception:
-            pass
-
-    async def _load_cookies(self):
+            update_interval=None,
+            always_update=False)
+
+    @property
+    def entry_id(self) -> str:
+        return self._entry_id
+
+    @property
+    def metrics_signal(self) -> str:
+        return f"{DOMAIN}_metrics_{self._entry_id}"
+
+    def next_interval(self) -> timedelta:
+        if self.adaptive is None or not self.data or self.data.error:
+            return self.interval
+        return self.adaptive.next_interval(self.data.data)
+
+    async def async_restore(self) -> None:
+        await self.cookie_store.async_load()
+        handoff = self.hub.take_login(self._login)
+        if handoff is not None:
+            logged_in_at, cookies = handoff
+            self.cookie_store.async_seed(cookies)
+            self.session_manager.async_adopt(logged_in_at)
+        await self.ledger.async_load()
+        await self.events.async_load()
+        snap = await self.snapshot.async_load()
+        if snap:
+            self.data = UmnyeSetiState(data=snap["data"], error=None, last_attempt=snap.get("last_attempt"), stale=True)
+            self._flat = flatten_state(self.data)
+
+    @callback
+    def async_track_local_time(self) -> None:
+        @callback
+        def _midnight(_now) -> None:
+            self.async_recompute_local()
+
+        @callback
+        def _core_config(_event: Event) -> None:
+            self.async_recompute_local()
+
+        self._unsub_local = [
+            async_track_time_change(self.hass, _midnight, hour=0, minute=0, second=1),
+            self.hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, _core_config),
+        ]
+
+    @callback
+    def async_recompute_local(self) -> None:
+        # end_days and the localised dates depend on the local date, time zone and language, not on the portal.
+        st = self.data
+        if self.model is None or st is None or st.data is None or st.stale:
+            return
+        data = self._render()
+        if data is st.data:
+            return
+        state = replace(st, data=data)
+        if not self._track_changes(state):
+            return
+        self._process_events(state)
+        self.async_set_updated_data(state)
+
+    @callback
+    def _process_events(self, state: UmnyeSetiState) -> None:
         try:
-            import os
-            if not os.path.exists(self._cookie_path):
-                return
-            def _read():
-                with open(self._cookie_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            data = await self.hass.async_add_executor_job(_read)
-            if isinstance(data, dict) and data:
-                self.session.cookie_jar.update_cookies(data, response_url=self._cookie_url)
+            end_days = ((state.data or {}).get("tariff") or {}).get("end_days")
+            self.events.async_process(self.model, self._new_rows, end_days)
         except Exception as e:
-            _LOGGER.debug("%s: failed to load cookies: %s", DOMAIN, e)
+            _LOGGER.debug("%s: failed to fire events: %s", DOMAIN, e)
 
-    async def _save_cookies(self):
-        try:
-            cookies = {k: v.value for k, v in self.session.cookie_jar.filter_cookies(self._cookie_url).items()}
-            def _write():
-                with open(self._cookie_path, "w", encoding="utf-8") as f:
-                    json.dump(cookies, f, ensure_ascii=False, indent=2)
-            await self.hass.async_add_executor_job(_write)
-        except Exception as e:
-            _LOGGER.debug("%s: failed to save cookies: %s", DOMAIN, e)
+    async def async_close(self):
+        for unsub in self._unsub_local:
+            unsub()
+        self._unsub_local = []
+        self.hub.async_unregister(self._entry_id)
+        self.session_manager.async_close()
+        for store in (self.cookie_store, self.ledger, self.snapshot, self.events):
+            try:
+                await store.async_flush()
+            except Exception as e:
+                _LOGGER.debug("%s: failed to flush storage: %s", DOMAIN, e)
+        await self.session.close()
 
     def _raise_issue(self, message: str):
         try:
@@ -115,167 +225,156 @@ class UmnyeSetiCoordinator(DataUpdateCoordinator[UmnyeSetiState]):
         lang = getattr(self.hass.config, "language", None) or "en"
         return str(lang).lower()
 
-    def _localize_unknown(self) -> str:
-        return "Неизвестно" if self._lang().startswith("ru") else "Unknown"
-
-    def _localize_period(self, raw: Optional[str]) -> Optional[str]:
-        if not raw:
-            return None
-        r = str(raw).lower()
-        if self._lang().startswith("ru"):
-            return "год" if r == "y" else ("месяц" if r == "m" else r)
-        else:
-            return "year" if r == "y" else ("month" if r == "m" else r)
-
-    def _localize_speed_unit(self, unit: Optional[str]) -> Optional[str]:
-        if not unit:
-            return None
-        u = str(unit).lower()
-        if self._lang().startswith("ru"):
-            return "Мбит/с" if u in ("мбит/с", "mbps", "мбитс") else unit
-        return "Mbps" if u in ("мбит/с", "mbps", "мбитс") else unit
-
-    def _money(self, val: Optional[float]) -> Optional[float]:
-        if val is None:
-            return None
-        try:
-            return round(float(val), 2)
-        except Exception:
-            return None
-
-    def _normalize_mac(self, s: Optional[str]) -> Optional[str]:
-        if not s:
-            return None
-        s = s.strip().replace("-", ":").replace(" ", "")
-        return s.lower()
-
-    def _to_human(self, iso: Optional[str]) -> Optional[str]:
-        if not iso:
-            return None
-        try:
-            dt = dt_util.parse_datetime(iso)
-            if not dt:
-                return None
-            dt = dt_util.as_local(dt)
-            return dt.strftime("%d.%m.%Y, %H:%M")
-        except Exception:
-            return None
-
-    def _days_until(self, iso: Optional[str]) -> Optional[int]:
-        try:
-            if not iso:
-                return None
-            dt = dt_util.parse_datetime(iso)
-            if not dt:
-                return None
-            local = dt_util.as_local(dt)
-            now_local = dt_util.as_local(dt_util.utcnow())
-            d1 = now_local.date()
-            d2 = local.date()
-            return (d2 - d1).days
-        except Exception:
-            return None
-
     async def _async_update_data(self) -> UmnyeSetiState:
+        self._new_payments = 0
+        self._new_rows = []
+        breaker = self.hub.breaker(self._base_url)
+        if breaker.is_open:
+            return self._circuit_open_state()
+        started = time.perf_counter()
+        # Transport and portal failures come back as error states; only those in _OUTAGE_ERRORS count
+        # against the shared breaker, so a local bug for one account cannot stop polling for the others.
+        state: Optional[UmnyeSetiState] = None
+        try:
+            async with self.hub.slot():
+                self.metrics.record("queue", time.perf_counter() - started)
+                # Checked again after the wait: the circuit may have opened while this refresh was queued.
+                if breaker.allow():
+                    breaker.retry_budget.record_request()
+                    with breaker.release_on_error():
+                        state = await self._async_fetch_state()
+        finally:
+            self.metrics.record("refresh", time.perf_counter() - started)
+            async_dispatcher_send(self.hass, self.metrics_signal)
+        if state is None:
+            return self._circuit_open_state()
+        if state.error == "retry_budget_exhausted":
+            # Our own throttle, not a portal outage: keep the previous state and retry on the next slot.
+            breaker.record_skipped()
+            return self.data if self.data is not None else state
+        if state.error and state.error.startswith(_OUTAGE_ERRORS):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if state is not self.data:
+            self._track_changes(state)
+        if self.adaptive is not None and not state.error:
+            self.adaptive.observe(state.data, state is not self.data, self._new_payments)
+        if not state.error and self.model is not None:
+            self._process_events(state)
+            self.hass.async_create_background_task(
+                self.statistics.async_import(self.model.balance, self.ledger.rows, self._new_rows),
+                f"{DOMAIN} statistics {self._entry_id}")
+        return state
+
+    def _circuit_open_state(self) -> UmnyeSetiState:
+        # Provider outage: keep serving the last known state without touching the network.
+        if self.data is not None:
+            return self.data
+        return UmnyeSetiState(data=None, error="circuit_open", last_attempt=dt_util.utcnow().isoformat())
+
+    def _track_changes(self, state: UmnyeSetiState) -> bool:
+        flat = flatten_state(state)
+        self.changed = changed_keys(self._flat, flat) if self.data is not None else None
+        self._flat = flat
+        if self.changed is not None and not self.changed:
+            return False
+        if not state.error and state.data is not None:
+            self.snapshot.async_schedule_save(state.data, state.last_attempt)
+        return True
+
+    def _unchanged_state(self) -> Optional[UmnyeSetiState]:
+        # Returning the very same object lets DataUpdateCoordinator skip listener updates.
+        st = self.data
+        if st is not None and st.data is not None and not st.error and not st.stale:
+            return st
+        return None
+
+    async def _async_fetch_state(self) -> UmnyeSetiState:
         now_utc = dt_util.utcnow()
         prev = self.data.data if self.data else None
+        # Failed attempts keep serving prev, so they keep its staleness too (e.g. a restored snapshot).
+        stale = self.data.stale if self.data else False
 
         try:
-            j = await self.api.fetch_json()
+            j = await self.session_manager.async_fetch()
         except Exception as e:
             self._raise_issue(f"fetch_exception: {e}")
-            return UmnyeSetiState(data=prev, error=f"fetch_exception: {e}", last_attempt=now_utc.isoformat())
+            return UmnyeSetiState(data=prev, error=f"fetch_exception: {e}", last_attempt=now_utc.isoformat(), stale=stale)
+
+        if isinstance(j, dict) and j.get("status") == "not_modified":
+            unchanged = self._unchanged_state()
+            if unchanged is not None:
+                return unchanged
+            self.api.reset_validators()
+            try:
+                j = await self.session_manager.async_fetch()
+            except Exception as e:
+                self._raise_issue(f"fetch_exception: {e}")
+                return UmnyeSetiState(data=prev, error=f"fetch_exception: {e}", last_attempt=now_utc.isoformat(), stale=stale)
 
         if isinstance(j, dict) and j.get("error") in ("unauthorized", "invalid_json"):
+            if not self.hub.breaker(self._base_url).retry_budget.try_spend():
+                return UmnyeSetiState(data=prev, error="retry_budget_exhausted", last_attempt=now_utc.isoformat(), stale=stale)
             try:
-                auth_resp = await self.api.auth(self._login, self._password)
+                auth_resp = await self.session_manager.async_login()
             except Exception as e:
                 self._raise_issue(f"auth_exception: {e}")
-                return UmnyeSetiState(data=prev, error=f"auth_exception: {e}", last_attempt=now_utc.isoformat())
+                return UmnyeSetiState(data=prev, error=f"auth_exception: {e}", last_attempt=now_utc.isoformat(), stale=stale)
 
             if not auth_resp or (isinstance(auth_resp, dict) and auth_resp.get("error")):
                 err = auth_resp.get("error") if isinstance(auth_resp, dict) else "auth_failed"
                 msg = (auth_resp or {}).get("message") if isinstance(auth_resp, dict) else ""
                 self._raise_issue(f"auth_failed: {msg or err}")
-                return UmnyeSetiState(data=prev, error=f"auth_failed: {msg or err}", last_attempt=now_utc.isoformat())
+                return UmnyeSetiState(data=prev, error=f"auth_failed: {msg or err}", last_attempt=now_utc.isoformat(), stale=stale)
 
             try:
-                j = await self.api.fetch_json()
+                j = await self.session_manager.async_fetch()
             except Exception as e:
                 self._raise_issue(f"fetch_after_auth_exception: {e}")
-                return UmnyeSetiState(data=prev, error=f"fetch_after_auth_exception: {e}", last_attempt=now_utc.isoformat())
+                return UmnyeSetiState(data=prev, error=f"fetch_after_auth_exception: {e}", last_attempt=now_utc.isoformat(), stale=stale)
 
         if not isinstance(j, dict):
             self._raise_issue("invalid_response")
-            return UmnyeSetiState(data=prev, error="invalid_response", last_attempt=now_utc.isoformat())
+            return UmnyeSetiState(data=prev, error="invalid_response", last_attempt=now_utc.isoformat(), stale=stale)
 
         if j.get("error"):
             err = j.get("error")
             self._raise_issue(f"errors: {err}")
-            return UmnyeSetiState(data=prev, error=f"errors: {err}", last_attempt=now_utc.isoformat())
+            return UmnyeSetiState(data=prev, error=f"errors: {err}", last_attempt=now_utc.isoformat(), stale=stale)
 
         raw = j.get("data")
         if raw is None:
             self._raise_issue("no_data")
-            return UmnyeSetiState(data=prev, error="no_data", last_attempt=now_utc.isoformat())
+            return UmnyeSetiState(data=prev, error="no_data", last_attempt=now_utc.isoformat(), stale=stale)
 
+        # Digest of the response body that produced j; language and local date only affect rendering,
+        # which the presenter caches separately.
+        fingerprint = self.api.last_digest
+        try:
+            with self.metrics.phase("map"):
+                if fingerprint is None or fingerprint != self._fingerprint or self.model is None:
+                    # Only remember the digest once the payload decoded; a failed decode must be retried.
+                    self._fingerprint = None
+                    self._decode(raw)
+                    self._fingerprint = fingerprint
+                mapped = self._render()
+        except Exception as e:
+            # The portal answered; this account's payload is the problem, not the provider.
+            _LOGGER.debug("%s: failed to map payload: %s", DOMAIN, e)
+            self._raise_issue(f"map_exception: {e}")
+            return UmnyeSetiState(data=prev, error=f"map_exception: {e}", last_attempt=now_utc.isoformat(), stale=stale)
         self._clear_issue()
-        return UmnyeSetiState(data=self._map_payload(raw), error=None, last_attempt=now_utc.isoformat())
-
-    def _map_payload(self, data: dict) -> dict:
-        vlanID = "0"
-        ip = "0.0.0.0"
-        mac = "00:00:00:00:00:00"
-        address = self._localize_unknown()
-
-        for addr in data.get("equipment_addresses", []):
-            t = str(addr.get("n_addr_type_id"))
-            if t == "5006":
-                vlanID = addr.get("vc_code", vlanID)
-            elif t == "4006":
-                mac = self._normalize_mac(addr.get("vc_code")) or mac
-            elif t == "3006":
-                ip = addr.get("vc_code", ip)
-            elif t == "1006":
-                address = addr.get("vc_code", address) or self._localize_unknown()
-
-        pays = []
-        for p in data.get("activities", []):
-            iso = p.get("d_oper")
-            amount = self._money(p.get("n_value_1"))
-            human = self._to_human(iso)
-            pays.append({"date": human, "amount": amount})
-
-        serv0 = (data.get("servs") or [{}])[0]
-        tariff_info = serv0.get("detailed_info", {}) or {}
-        speed_val = tariff_info.get("n_speed_volume_cur")
-        speed_unit = self._localize_speed_unit(tariff_info.get("vc_speed_unit_cur"))
-        period_text = self._localize_period(serv0.get("c_period"))
-        end_iso = serv0.get("d_charge_log_end")
-        end_human = self._to_human(end_iso)
-        end_days = self._days_until(end_iso)
-
-        balance = self._money((data.get("personal_accounts") or [{}])[0].get("n_sum_bal"))
-        tariff_amount = self._money(serv0.get("n_good_base_sum"))
-        pay_left = None
-        if tariff_amount is not None and balance is not None:
-            pay_left = max(round(tariff_amount - balance, 2), 0.0)
-
-        mapped = {
-            "account": (data.get("personal_accounts") or [{}])[0].get("vc_account"),
-            "balance": balance,
-            "subscriber": (data.get("person") or {}).get("vc_name"),
-            "address": address,
-            "net": {"ip": ip, "mac": mac, "vlan": vlanID},
-            "tariff": {
-                "name": serv0.get("vc_name"),
-                "speed": f"{speed_val} {speed_unit}".strip() if speed_val is not None else None,
-                "amount": tariff_amount,
-                "period": period_text,
-                "end_subscribe": end_human,
-                "end_days": end_days,
-                "pay_subscribe": pay_left,
-            },
-            "pays": pays,
-        }
-        return mapped
+        unchanged = self._unchanged_state()
+        if unchanged is not None and unchanged.data is mapped:
+            return unchanged
+        return UmnyeSetiState(data=mapped, error=None, last_attempt=now_utc.isoformat())
+
+    def _decode(self, raw: dict) -> None:
+        self.model = decode_account(raw)
+        self._new_rows = self.ledger.async_add(raw.get("activities") or [])
+        self._new_payments = len(self._new_rows)
+        self.presenter.invalidate()
+
+    def _render(self) -> dict:
+        return self.presenter.render(self.model, self.ledger, self._lang(), dt_util.DEFAULT_TIME_ZONE, dt_util.now().date())
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_LOGIN, CONF_PASSWORD
+from .coordinator import UmnyeSetiCoordinator
+
+TO_REDACT = {
+    CONF_LOGIN,
+    CONF_PASSWORD,
+    "title",
+    "unique_id",
+    "account",
+    "accounts",
+    "subscriber",
+    "address",
+    "ip",
+    "mac",
+    "vlan",
+    "pays",
+}
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    coordinator: UmnyeSetiCoordinator = hass.data[DOMAIN][entry.entry_id]
+    st = coordinator.data
+    breaker = coordinator.hub.breaker(coordinator._base_url)
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "state": {
+            "error": st.error if st else "no_state",
+            "last_attempt": st.last_attempt if st else None,
+            "data": async_redact_data(st.data, TO_REDACT) if st and st.data else None,
+        },
+        "schedule": {
+            "adaptive": coordinator.adaptive is not None,
+            "next_interval_s": coordinator.next_interval().total_seconds(),
+            "max_concurrency": coordinator.hub.max_concurrency,
+        },
+        "circuit": {"state": breaker.state},
+        "session": {"expires_at": coordinator.session_manager.expires_at()},
+        "timeouts": coordinator.api.timeouts.as_dict(),
+        "metrics": coordinator.metrics.as_dict(),
+    }
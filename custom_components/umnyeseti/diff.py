@@ -0,0 +1,30 @@
+from __future__ import annotations
+from typing import Any
+
+_MISSING = object()
+
+def flatten(node: dict, prefix: str = "") -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for k, v in node.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(flatten(v, f"{key}."))
+        else:
+            out[key] = v
+    return out
+
+def flatten_state(state) -> dict[str, Any]:
+    if state is None:
+        return {"error": "no_state", "last_attempt": None, "stale": False}
+    flat = flatten(state.data) if isinstance(state.data, dict) else {}
+    flat["error"] = state.error
+    flat["last_attempt"] = state.last_attempt
+    flat["stale"] = state.stale
+    return flat
+
+def touches(changed: frozenset[str], watch: tuple[str, ...]) -> bool:
+    # A watched key covers itself and everything flattened below it ("pays_monthly" -> "pays_monthly.2024-05").
+    return any(k == w or k.startswith(f"{w}.") for k in changed for w in watch)
+
+def changed_keys(old: dict[str, Any], new: dict[str, Any]) -> frozenset[str]:
+    return frozenset(k for k in old.keys() | new.keys() if old.get(k, _MISSING) != new.get(k, _MISSING))
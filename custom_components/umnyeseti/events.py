@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    EVENT_PAYMENT_RECEIVED,
+    EVENT_BALANCE_LOW,
+    EVENT_TARIFF_CHANGED,
+    EVENT_RENEWAL_DUE,
+    EVENT_RENEWAL_DAYS,
+    EVENTS_SAVE_DELAY)
+from .model import Account
+from .storage import EntryStore
+
+class EventEmitter(EntryStore):
+    # Fires each semantic event once; what has been fired is persisted so restarts do not repeat it.
+    def __init__(self, hass: HomeAssistant, entry_id: str, account_name: str):
+        super().__init__(hass, "events", entry_id, EVENTS_SAVE_DELAY)
+        self._entry_id = entry_id
+        self._name = account_name
+        self._seen: dict = {}
+
+    async def async_load(self) -> None:
+        data = await self._async_read()
+        if isinstance(data, dict):
+            self._seen = data
+
+    def _payload(self) -> dict:
+        return self._seen
+
+    @callback
+    def _remember(self, key: str, value) -> None:
+        self._seen[key] = value
+        self._mark_dirty()
+
+    @callback
+    def _fire(self, event_type: str, data: dict) -> None:
+        self.hass.bus.async_fire(event_type, {"entry_id": self._entry_id, "name": self._name, **data})
+
+    @callback
+    def async_process(self, model: Account, new_rows: list[dict], end_days: Optional[int]) -> None:
+        self._payments(new_rows)
+        self._balance(model)
+        self._tariff(model)
+        self._renewal(model, end_days)
+
+    def _payments(self, new_rows: list[dict]) -> None:
+        if "payment_iso" not in self._seen:
+            # First successful refresh: whatever it brought was backfilled, not news. The baseline is set even
+            # without any payments (None), so a brand-new account's first top-up still fires.
+            self._remember("payment_iso", max((r["iso"] for r in new_rows), default=None))
+            return
+        if not new_rows:
+            return
+        last = self._seen["payment_iso"]
+        rows = sorted((r for r in new_rows if last is None or r["iso"] > last), key=lambda r: r["iso"])
+        if not rows:
+            return
+        self._remember("payment_iso", rows[-1]["iso"])
+        self._fire(EVENT_PAYMENT_RECEIVED, {
+            "payments": [{"iso": r["iso"], "amount": r.get("amount")} for r in rows],
+            "total": round(sum(r.get("amount") or 0.0 for r in rows), 2),
+        })
+
+    def _balance(self, model: Account) -> None:
+        pay_left = model.pay_left
+        if pay_left is None:
+            return
+        low = pay_left > 0
+        if low == bool(self._seen.get("balance_low")):
+            return
+        self._remember("balance_low", low)
+        # Edge-triggered: fires when the balance stops covering the next charge, re-arms once it does again.
+        if low:
+            self._fire(EVENT_BALANCE_LOW, {"balance": model.balance, "pay_left": pay_left, "amount": model.tariff.amount})
+
+    def _tariff(self, model: Account) -> None:
+        t = model.tariff
+        current = {"service_id": t.service_id, "name": t.name, "amount": t.amount}
+        previous = self._seen.get("tariff")
+        if previous == current:
+            return
+        self._remember("tariff", current)
+        if previous is not None:
+            self._fire(EVENT_TARIFF_CHANGED, {"old": previous, "new": current})
+
+    def _renewal(self, model: Account, end_days: Optional[int]) -> None:
+        end = model.tariff.end
+        # Same window as the adaptive schedule: a tariff that ended long ago is not a renewal coming up.
+        if end is None or end_days is None or not -1 <= end_days <= EVENT_RENEWAL_DAYS:
+            return
+        iso = end.isoformat()
+        if self._seen.get("renewal_end") == iso:
+            return
+        self._remember("renewal_end", iso)
+        self._fire(EVENT_RENEWAL_DUE, {"end": iso, "days": end_days, "pay_left": model.pay_left})
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import time
+import zlib
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientSession, CookieJar, TCPConnector
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE, Event, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import ssl as ssl_util
+from yarl import URL
+
+from .breaker import CircuitBreaker
+from .const import (
+    DOMAIN,
+    INIT_URL,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_RESPONSE_KB,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_RESPONSE_KB,
+    SCHEDULE_JITTER,
+    STARTUP_STAGGER_WINDOW,
+    CONNECTOR_KEEPALIVE,
+    CONNECTOR_DNS_TTL,
+    ONBOARDING_HANDOFF_TTL)
+
+if TYPE_CHECKING:
+    from .coordinator import UmnyeSetiCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+HUB_KEY = "hub"
+
+class UmnyeSetiHub:
+    def __init__(self, hass: HomeAssistant, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_response_kb: int = DEFAULT_MAX_RESPONSE_KB):
+        self.hass = hass
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.max_body_bytes = max(int(max_response_kb), 1) * 1024
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._connectors: dict[bool, TCPConnector] = {}
+        self._members: dict[str, UmnyeSetiCoordinator] = {}
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._handoffs: dict[str, tuple[float, dict[str, str]]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._finished: dict[str, float] = {}
+        self._unsub_close = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_on_close)
+
+    def _connector(self, verify_ssl: bool) -> TCPConnector:
+        conn = self._connectors.get(verify_ssl)
+        if conn is None or conn.closed:
+            ctx = ssl_util.get_default_context() if verify_ssl else ssl_util.get_default_no_verify_context()
+            # One pool per verify_ssl for every entry and the config flow: a connection opened by one login
+            # is reused by the next instead of resolving and TLS-handshaking the portal again.
+            conn = TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.max_concurrency,
+                ssl=ctx,
+                use_dns_cache=True,
+                ttl_dns_cache=CONNECTOR_DNS_TTL,
+                keepalive_timeout=CONNECTOR_KEEPALIVE)
+            self._connectors[verify_ssl] = conn
+        return conn
+
+    def create_session(self, verify_ssl: bool = True, trace_configs: list | None = None) -> ClientSession:
+        # Every account keeps its own cookie jar; only the connection pool is shared.
+        return ClientSession(
+            connector=self._connector(verify_ssl),
+            connector_owner=False,
+            cookie_jar=CookieJar(),
+            trace_configs=trace_configs)
+
+    @property
+    def members(self) -> dict[str, UmnyeSetiCoordinator]:
+        return self._members
+
+    def breaker(self, url: str = INIT_URL) -> CircuitBreaker:
+        host = URL(url).host or url
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(f"{DOMAIN} {host}")
+        return breaker
+
+    @callback
+    def stash_login(self, login: str, cookies: dict[str, str]) -> None:
+        # The config flow has just logged in; let the entry it creates start from that session.
+        self._handoffs[login] = (time.time(), cookies)
+
+    @callback
+    def take_login(self, login: str) -> tuple[float, dict[str, str]] | None:
+        handoff = self._handoffs.pop(login, None)
+        if handoff is None or time.time() - handoff[0] > ONBOARDING_HANDOFF_TTL:
+            return None
+        return handoff
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._semaphore:
+            yield
+
+    def _phase(self, entry_id: str, interval: float) -> float:
+        return (zlib.crc32(entry_id.encode("utf-8")) % 10_000) / 10_000 * interval
+
+    def _next_delay(self, coordinator: UmnyeSetiCoordinator) -> float:
+        interval = coordinator.next_interval().total_seconds()
+        if coordinator.adaptive is not None:
+            # Adaptive intervals change from poll to poll, so a fixed phase grid does not apply.
+            return interval + random.uniform(0, SCHEDULE_JITTER * interval)
+        now = self.hass.loop.time()
+        delay = interval - ((now - self._phase(coordinator.entry_id, interval)) % interval)
+        # A manual refresh or the startup stagger can finish just before this entry's grid slot;
+        # polling again seconds later is wasted, so skip to the following slot.
+        since = self.since_refresh(coordinator.entry_id)
+        if since is not None and since + delay < interval / 2:
+            delay += interval
+        return delay + random.uniform(0, SCHEDULE_JITTER * interval)
+
+    @callback
+    def async_register(self, coordinator: UmnyeSetiCoordinator, refresh_now: bool = False) -> None:
+        self._members[coordinator.entry_id] = coordinator
+        if refresh_now:
+            # First refresh after setup: spread accounts over a short window instead of the full interval.
+            window = min(STARTUP_STAGGER_WINDOW, coordinator.interval.total_seconds())
+            self._schedule(coordinator, self._phase(coordinator.entry_id, window) + random.uniform(0, 1))
+        else:
+            self._schedule(coordinator)
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        self._members.pop(entry_id, None)
+        self._finished.pop(entry_id, None)
+        self._inflight.pop(entry_id, None)
+        unsub = self._timers.pop(entry_id, None)
+        if unsub:
+            unsub()
+
+    @callback
+    def _schedule(self, coordinator: UmnyeSetiCoordinator, delay: float | None = None) -> None:
+        entry_id = coordinator.entry_id
+        unsub = self._timers.pop(entry_id, None)
+        if unsub:
+            unsub()
+        entry = coordinator.config_entry
+        if entry is not None and entry.pref_disable_polling:
+            return
+
+        @callback
+        def _fire(_now) -> None:
+            self._timers.pop(entry_id, None)
+            if self._members.get(entry_id) is not coordinator:
+                return
+            self.refresh(coordinator)
+
+        if delay is None:
+            delay = self._next_delay(coordinator)
+        self._timers[entry_id] = async_call_later(self.hass, delay, _fire)
+        coordinator.session_manager.async_poll_scheduled(time.time() + delay, coordinator.next_interval().total_seconds())
+
+    @callback
+    def refresh(self, coordinator: UmnyeSetiCoordinator) -> tuple[asyncio.Task, bool]:
+        # Timer and service refreshes of one entry share a single task, so they never log in twice in parallel.
+        entry_id = coordinator.entry_id
+        if self.refreshing(entry_id):
+            return self._inflight[entry_id], True
+        task = self._inflight[entry_id] = self.hass.async_create_background_task(
+            self._async_run(coordinator), f"{DOMAIN} refresh {entry_id}")
+        return task, False
+
+    def refreshing(self, entry_id: str) -> bool:
+        task = self._inflight.get(entry_id)
+        return task is not None and not task.done()
+
+    def since_refresh(self, entry_id: str) -> float | None:
+        finished = self._finished.get(entry_id)
+        return self.hass.loop.time() - finished if finished is not None else None
+
+    async def _async_run(self, coordinator: UmnyeSetiCoordinator) -> None:
+        entry_id = coordinator.entry_id
+        try:
+            await coordinator.async_refresh()
+        finally:
+            if self._inflight.get(entry_id) is asyncio.current_task():
+                del self._inflight[entry_id]
+            if self._members.get(entry_id) is coordinator:
+                self._finished[entry_id] = self.hass.loop.time()
+                self._schedule(coordinator)
+
+    async def _async_on_close(self, _event: Event) -> None:
+        for entry_id in list(self._timers):
+            self.async_unregister(entry_id)
+        for conn in self._connectors.values():
+            if not conn.closed:
+                await conn.close()
+        self._connectors.clear()
+
+@callback
+def async_get_hub(hass: HomeAssistant, conf: dict | None = None) -> UmnyeSetiHub:
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    hub = domain_data.get(HUB_KEY)
+    if hub is None:
+        conf = conf or {}
+        hub = UmnyeSetiHub(
+            hass,
+            conf.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            conf.get(CONF_MAX_RESPONSE_KB, DEFAULT_MAX_RESPONSE_KB))
+        domain_data[HUB_KEY] = hub
+    return hub
@@ -0,0 +1,51 @@
+from __future__ import annotations
+from typing import Iterable
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import LEDGER_SAVE_DELAY
+from .model import payment_row
+from .storage import EntryStore
+
+class PaymentLedger(EntryStore):
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        super().__init__(hass, "ledger", entry_id, LEDGER_SAVE_DELAY)
+        self._rows: list[dict] = []  # newest first
+        self._keys: set[tuple[str, float]] = set()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def async_load(self) -> None:
+        data = await self._async_read()
+        rows = (data or {}).get("rows") or []
+        self._rows = [r for r in rows if isinstance(r, dict) and r.get("iso")]
+        self._keys = {(r["iso"], r.get("amount")) for r in self._rows}
+
+    def _payload(self) -> dict:
+        return {"rows": self._rows}
+
+    @callback
+    def async_add(self, activities: Iterable[dict]) -> list[dict]:
+        new: list[dict] = []
+        for p in activities:
+            row = payment_row(p)
+            if row is None:
+                continue
+            key = (row["iso"], row["amount"])
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            new.append(row)
+        if new:
+            self._rows.extend(new)
+            self._rows.sort(key=lambda r: r["iso"], reverse=True)
+            self._mark_dirty()
+        return new
+
+    def last(self, n: int) -> list[dict]:
+        return self._rows[:n]
+
+    @property
+    def rows(self) -> list[dict]:
+        return self._rows
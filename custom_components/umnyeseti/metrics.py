@@ -0,0 +1,166 @@
+from __future__ import annotations
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Optional
+
+from aiohttp import TraceConfig
+
+from .const import METRICS_WINDOW
+
+class RollingHistogram:
+    def __init__(self, size: int = METRICS_WINDOW):
+        self._values: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+        self.count += 1
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._values[-1] if self._values else None
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def summary(self) -> dict:
+        if not self._values:
+            return {"count": self.count}
+        ordered = sorted(self._values)
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "last_ms": round(self._values[-1] * 1000, 2),
+            "p50_ms": round(ordered[n // 2] * 1000, 2),
+            "p95_ms": round(ordered[min(n - 1, int(n * 0.95))] * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+
+def kind_phase(kind: str, phase: str) -> str:
+    # Per-request-kind connection phase, e.g. "fetch.connect"; kinds come from trace_request_ctx.
+    return f"{kind}.{phase}"
+
+def _kind(ctx: SimpleNamespace) -> Optional[str]:
+    req = getattr(ctx, "trace_request_ctx", None)
+    return req.get("kind") if isinstance(req, dict) else None
+
+class RefreshMetrics:
+    def __init__(self):
+        self.phases: dict[str, RollingHistogram] = {}
+        self.auth_count = 0
+        self.bytes_received = 0
+        self.bytes_wire = 0
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.tls_handshakes = 0
+        self.handshakes_avoided = 0
+
+    def record(self, phase: str, seconds: float) -> None:
+        hist = self.phases.get(phase)
+        if hist is None:
+            hist = self.phases[phase] = RollingHistogram()
+        hist.add(seconds)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def add_bytes(self, n: int, wire: Optional[int] = None) -> None:
+        # n is the decoded body, wire what the portal actually sent (smaller when compressed).
+        self.bytes_received += n
+        self.bytes_wire += n if wire is None else wire
+
+    def _record_traced(self, ctx: SimpleNamespace, phase: str, seconds: float) -> None:
+        self.record(phase, seconds)
+        kind = _kind(ctx)
+        if kind:
+            self.record(kind_phase(kind, phase), seconds)
+
+    def last(self, phase: str) -> Optional[float]:
+        hist = self.phases.get(phase)
+        return hist.last if hist else None
+
+    def trace_config(self) -> TraceConfig:
+        # Connection-level phases that only aiohttp can see; TLS is part of "connect".
+        trace = TraceConfig()
+
+        async def _started(_session, ctx: SimpleNamespace, params) -> None:
+            ctx.started = time.perf_counter()
+            ctx.tls = params.url.scheme == "https"
+            self.requests += 1
+
+        async def _dns_start(_session, ctx: SimpleNamespace, _params) -> None:
+            ctx.dns_started = time.perf_counter()
+
+        async def _dns_end(_session, ctx: SimpleNamespace, _params) -> None:
+            self.record("dns", time.perf_counter() - ctx.dns_started)
+
+        async def _connect_start(_session, ctx: SimpleNamespace, _params) -> None:
+            ctx.connect_started = time.perf_counter()
+
+        async def _connect_end(_session, ctx: SimpleNamespace, _params) -> None:
+            self.connections_created += 1
+            if getattr(ctx, "tls", False):
+                self.tls_handshakes += 1
+            ctx.connected = True
+            self._record_traced(ctx, "connect", time.perf_counter() - ctx.connect_started)
+
+        async def _reuse(_session, ctx: SimpleNamespace, _params) -> None:
+            self.connections_reused += 1
+            if getattr(ctx, "tls", False):
+                self.handshakes_avoided += 1
+
+        async def _headers_sent(_session, ctx: SimpleNamespace, _params) -> None:
+            ctx.sent = time.perf_counter()
+
+        async def _ended(_session, ctx: SimpleNamespace, _params) -> None:
+            now = time.perf_counter()
+            if hasattr(ctx, "sent"):
+                self._record_traced(ctx, "server", now - ctx.sent)
+            self.record("request", now - ctx.started)
+
+        async def _failed(_session, ctx: SimpleNamespace, _params) -> None:
+            # Timed-out and failed attempts count too, with however long they waited, so budgets can widen.
+            now = time.perf_counter()
+            if hasattr(ctx, "sent"):
+                self._record_traced(ctx, "server", now - ctx.sent)
+            elif hasattr(ctx, "connect_started") and not getattr(ctx, "connected", False):
+                self._record_traced(ctx, "connect", now - ctx.connect_started)
+            self.record("request", now - ctx.started)
+
+        trace.on_request_start.append(_started)
+        trace.on_dns_resolvehost_start.append(_dns_start)
+        trace.on_dns_resolvehost_end.append(_dns_end)
+        trace.on_connection_create_start.append(_connect_start)
+        trace.on_connection_create_end.append(_connect_end)
+        trace.on_connection_reuseconn.append(_reuse)
+        trace.on_request_headers_sent.append(_headers_sent)
+        trace.on_request_end.append(_ended)
+        trace.on_request_exception.append(_failed)
+        return trace
+
+    def as_dict(self) -> dict:
+        return {
+            "auth_count": self.auth_count,
+            "bytes_received": self.bytes_received,
+            "bytes_wire": self.bytes_wire,
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "tls_handshakes": self.tls_handshakes,
+            "handshakes_avoided": self.handshakes_avoided,
+            "phases": {name: hist.summary() for name, hist in sorted(self.phases.items())},
+        }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+try:
+    from homeassistant.util import dt as dt_util
+except ImportError:  # the standalone exporter and the benchmarks run without Home Assistant
+    dt_util = None
+
+# n_addr_type_id values of equipment_addresses.
+ADDR_ADDRESS = "1006"
+ADDR_IP = "3006"
+ADDR_MAC = "4006"
+ADDR_VLAN = "5006"
+
+def parse_iso(iso: Optional[str]) -> Optional[datetime]:
+    if not iso:
+        return None
+    if dt_util is not None:
+        # Naive timestamps are in HA's configured zone, not the host's.
+        dt = dt_util.parse_datetime(str(iso))
+        if dt is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+        return dt
+    try:
+        return datetime.fromisoformat(str(iso))
+    except ValueError:
+        return None
+
+def money(val) -> Optional[float]:
+    if val is None:
+        return None
+    try:
+        return round(float(val), 2)
+    except Exception:
+        return None
+
+def normalize_mac(s: Optional[str]) -> Optional[str]:
+    if not s:
+        return None
+    return s.strip().replace("-", ":").replace(" ", "").lower()
+
+def payment_row(activity: dict) -> Optional[dict]:
+    iso = activity.get("d_oper")
+    if not iso:
+        return None
+    try:
+        amount = round(float(activity.get("n_value_1")), 2)
+    except Exception:
+        amount = None
+    return {"iso": iso, "amount": amount}
+
+class PaymentHistory:
+    # In-memory counterpart of the HA payment ledger, for use outside Home Assistant.
+    def __init__(self, activities=()):
+        seen: set[tuple[str, Optional[float]]] = set()
+        rows: list[dict] = []
+        for a in activities:
+            row = payment_row(a)
+            if row is None or (row["iso"], row["amount"]) in seen:
+                continue
+            seen.add((row["iso"], row["amount"]))
+            rows.append(row)
+        rows.sort(key=lambda r: r["iso"], reverse=True)
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def last(self, n: int) -> list[dict]:
+        return self.rows[:n]
+
+@dataclass(slots=True)
+class Tariff:
+    service_id: Optional[str] = None
+    name: Optional[str] = None
+    speed: Optional[float] = None
+    speed_unit: Optional[str] = None
+    amount: Optional[float] = None
+    period: Optional[str] = None  # raw period code, lower-case: "m" or "y"
+    end: Optional[datetime] = None
+
+@dataclass(slots=True)
+class PersonalAccount:
+    account: Optional[str] = None
+    balance: Optional[float] = None
+
+_NO_TARIFF = Tariff()
+_NO_ACCOUNT = PersonalAccount()
+
+@dataclass(slots=True)
+class Account:
+    subscriber: Optional[str] = None
+    # equipment_addresses indexed by n_addr_type_id; the last entry of each type wins.
+    addresses: dict[str, Optional[str]] = field(default_factory=dict)
+    # Indexed by service / account id in payload order; the first one is the primary.
+    services: dict[str, Tariff] = field(default_factory=dict)
+    accounts: dict[str, PersonalAccount] = field(default_factory=dict)
+
+    @property
+    def tariff(self) -> Tariff:
+        return next(iter(self.services.values()), _NO_TARIFF)
+
+    @property
+    def primary_account(self) -> PersonalAccount:
+        return next(iter(self.accounts.values()), _NO_ACCOUNT)
+
+    @property
+    def account(self) -> Optional[str]:
+        return self.primary_account.account
+
+    @property
+    def balance(self) -> Optional[float]:
+        return self.primary_account.balance
+
+    @property
+    def address(self) -> Optional[str]:
+        return self.addresses.get(ADDR_ADDRESS)
+
+    @property
+    def ip(self) -> Optional[str]:
+        return self.addresses.get(ADDR_IP)
+
+    @property
+    def mac(self) -> Optional[str]:
+        return normalize_mac(self.addresses.get(ADDR_MAC))
+
+    @property
+    def vlan(self) -> Optional[str]:
+        return self.addresses.get(ADDR_VLAN)
+
+    @property
+    def pay_left(self) -> Optional[float]:
+        amount, balance = self.tariff.amount, self.balance
+        if amount is None or balance is None:
+            return None
+        return max(round(amount - balance, 2), 0.0)
+
+def decode_tariff(serv: dict, service_id: str) -> Tariff:
+    info = serv.get("detailed_info", {}) or {}
+    period = serv.get("c_period")
+    return Tariff(
+        service_id=service_id,
+        name=serv.get("vc_name"),
+        speed=info.get("n_speed_volume_cur"),
+        speed_unit=info.get("vc_speed_unit_cur"),
+        amount=money(serv.get("n_good_base_sum")),
+        period=str(period).lower() if period else None,
+        end=parse_iso(serv.get("d_charge_log_end")))
+
+def decode_account(data: dict) -> Account:
+    # One pass over each list; lookups afterwards are by index, not by scanning.
+    addresses: dict[str, Optional[str]] = {}
+    for addr in data.get("equipment_addresses") or []:
+        addresses[str(addr.get("n_addr_type_id"))] = addr.get("vc_code")
+
+    services: dict[str, Tariff] = {}
+    for i, serv in enumerate(data.get("servs") or []):
+        sid = str(serv.get("n_serv_id") or i)
+        services[sid] = decode_tariff(serv, sid)
+
+    accounts: dict[str, PersonalAccount] = {}
+    for i, pa in enumerate(data.get("personal_accounts") or []):
+        acc = pa.get("vc_account")
+        accounts[str(acc or pa.get("n_account_id") or i)] = PersonalAccount(account=acc, balance=money(pa.get("n_sum_bal")))
+
+    return Account(
+        subscriber=(data.get("person") or {}).get("vc_name"),
+        addresses=addresses,
+        services=services,
+        accounts=accounts)
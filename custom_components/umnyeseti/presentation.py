@@ -0,0 +1,137 @@
+from __future__ import annotations
+from datetime import date, datetime, tzinfo
+from functools import lru_cache
+from typing import Optional
+
+from .model import Account, Tariff, parse_iso
+from .const import PAYMENTS_WINDOW, PAYMENTS_MONTHS, LOCAL_DT_CACHE_SIZE
+
+_SPEED_UNITS = ("мбит/с", "mbps", "мбитс")
+
+def _ru(lang: str) -> bool:
+    return lang.startswith("ru")
+
+def plural_days_ru(n: int) -> str:
+    last = n % 10
+    last2 = n % 100
+    if last == 1 and last2 != 11:
+        suffix = "день"
+    elif 2 <= last <= 4 and not 12 <= last2 <= 14:
+        suffix = "дня"
+    else:
+        suffix = "дней"
+    return f"{n} {suffix}"
+
+def unknown(lang: str) -> str:
+    return "Неизвестно" if _ru(lang) else "Unknown"
+
+def period_text(code: Optional[str], lang: str) -> Optional[str]:
+    if not code:
+        return None
+    if _ru(lang):
+        return "год" if code == "y" else ("месяц" if code == "m" else code)
+    return "year" if code == "y" else ("month" if code == "m" else code)
+
+def speed_unit_text(unit: Optional[str], lang: str) -> Optional[str]:
+    if not unit:
+        return None
+    if str(unit).lower() in _SPEED_UNITS:
+        return "Мбит/с" if _ru(lang) else "Mbps"
+    return unit
+
+def end_text(days: Optional[int], lang: str) -> Optional[str]:
+    if days is None:
+        return None
+    if days < 0:
+        return "просрочено" if _ru(lang) else "overdue"
+    if days == 0:
+        return "сегодня" if _ru(lang) else "today"
+    if days == 1:
+        return "завтра" if _ru(lang) else "tomorrow"
+    return plural_days_ru(days) if _ru(lang) else f"{days} days"
+
+@lru_cache(maxsize=LOCAL_DT_CACHE_SIZE)
+def local_dt(iso: Optional[str], tz: tzinfo) -> Optional[datetime]:
+    # Payment history barely changes between polls, so each timestamp is parsed once per zone.
+    dt = parse_iso(iso)
+    return dt.astimezone(tz) if dt is not None else None
+
+@lru_cache(maxsize=LOCAL_DT_CACHE_SIZE)
+def human_dt(iso: Optional[str], tz: tzinfo) -> Optional[str]:
+    dt = local_dt(iso, tz)
+    return dt.strftime("%d.%m.%Y, %H:%M") if dt is not None else None
+
+def pays_view(rows: list[dict], tz: tzinfo) -> list[dict]:
+    # Rows already seen on a previous poll are cache hits in human_dt.
+    return [{"date": human_dt(r["iso"], tz), "amount": r.get("amount")} for r in rows]
+
+def monthly_totals(rows: list[dict], tz: tzinfo, months: int) -> dict[str, float]:
+    # rows are newest first, so the first `months` distinct months are the most recent ones.
+    totals: dict[str, float] = {}
+    for r in rows:
+        dt = local_dt(r["iso"], tz)
+        if dt is None or r.get("amount") is None:
+            continue
+        month = f"{dt.year:04d}-{dt.month:02d}"
+        if month not in totals:
+            if len(totals) >= months:
+                break
+            totals[month] = 0.0
+        totals[month] = round(totals[month] + r["amount"], 2)
+    return totals
+
+def tariff_view(t: Tariff, lang: str, tz: tzinfo, today: date) -> dict:
+    end = t.end.astimezone(tz) if t.end is not None else None
+    end_days = (end.date() - today).days if end is not None else None
+    unit = speed_unit_text(t.speed_unit, lang)
+    speed = None
+    if t.speed is not None:
+        speed = f"{t.speed} {unit}" if unit else str(t.speed)
+    return {
+        "name": t.name,
+        "speed": speed,
+        "amount": t.amount,
+        "period": period_text(t.period, lang),
+        "end_subscribe": end.strftime("%d.%m.%Y, %H:%M") if end is not None else None,
+        "end_days": end_days,
+        "end_text": end_text(end_days, lang),
+    }
+
+class Presenter:
+    # Rendered views of the canonical model, keyed by what they depend on besides the data itself.
+    def __init__(self):
+        self._cache: dict[tuple[str, str, date], dict] = {}
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    def render(self, model: Account, ledger, lang: str, tz: tzinfo, today: date) -> dict:
+        key = (lang, str(tz), today)
+        view = self._cache.get(key)
+        if view is None:
+            if len(self._cache) >= 4:
+                # Old dates are never asked for again.
+                self._cache.clear()
+            view = self._cache[key] = self._render(model, ledger, lang, tz, today)
+        return view
+
+    def _render(self, model: Account, ledger, lang: str, tz: tzinfo, today: date) -> dict:
+        tariff = tariff_view(model.tariff, lang, tz, today)
+        tariff["pay_subscribe"] = model.pay_left
+        return {
+            "account": model.account,
+            "balance": model.balance,
+            "subscriber": model.subscriber,
+            "address": model.address or unknown(lang),
+            "net": {
+                "ip": model.ip or "0.0.0.0",
+                "mac": model.mac or "00:00:00:00:00:00",
+                "vlan": model.vlan or "0",
+            },
+            "tariff": tariff,
+            "services": {sid: tariff_view(t, lang, tz, today) for sid, t in model.services.items()},
+            "accounts": {aid: {"account": a.account, "balance": a.balance} for aid, a in model.accounts.items()},
+            "pays": pays_view(ledger.last(PAYMENTS_WINDOW), tz),
+            "pays_monthly": monthly_totals(ledger.rows, tz, PAYMENTS_MONTHS),
+            "pays_count": len(ledger),
+        }
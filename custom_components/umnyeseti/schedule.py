@@ -0,0 +1,48 @@
+from __future__ import annotations
+import time
+from datetime import timedelta
+from typing import Optional
+
+from .const import ADAPTIVE_RECENT_CHANGE, ADAPTIVE_RENEWAL_DAYS
+
+class AdaptivePolicy:
+    def __init__(self, floor: timedelta, ceiling: timedelta):
+        self.floor = floor
+        self.ceiling = max(ceiling, floor)
+        self._stable_polls = 0
+        self._changed_at: Optional[float] = None
+        self._balance = None
+
+    def observe(self, data: Optional[dict], changed: bool, new_payments: int = 0) -> None:
+        if not data:
+            return
+        balance = data.get("balance")
+        if new_payments or (changed and balance != self._balance and self._balance is not None):
+            self._changed_at = time.monotonic()
+            self._stable_polls = 0
+        elif changed:
+            self._stable_polls = max(self._stable_polls - 1, 0)
+        else:
+            self._stable_polls += 1
+        self._balance = balance
+
+    def next_interval(self, data: Optional[dict]) -> timedelta:
+        floor = self.floor.total_seconds()
+        ceiling = self.ceiling.total_seconds()
+        tariff = (data or {}).get("tariff") or {}
+        end_days = tariff.get("end_days")
+        pay_left = tariff.get("pay_subscribe")
+
+        # Renewal is imminent (or was due yesterday), or money just moved: stay close to the floor.
+        # Long expired or terminated accounts fall through and back off like any other stable account.
+        if end_days is not None and -1 <= end_days <= ADAPTIVE_RENEWAL_DAYS and (pay_left or end_days <= 0):
+            return self.floor
+        if self._changed_at is not None and time.monotonic() - self._changed_at < ADAPTIVE_RECENT_CHANGE:
+            return self.floor
+
+        # Otherwise back off exponentially while the account stays unchanged ...
+        seconds = floor * (2 ** min(self._stable_polls, 16))
+        # ... but keep a few polls between now and the renewal date.
+        if end_days is not None and end_days > 0:
+            seconds = min(seconds, end_days * 86400 / 4)
+        return timedelta(seconds=min(max(seconds, floor), ceiling))
@@ -2,15 +2,19 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Optional, List
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
+from homeassistant.const import UnitOfInformation, UnitOfTime
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DOMAIN, CONF_LOGIN
 from .coordinator import UmnyeSetiCoordinator
+from .diff import touches
 
 
 ICON = {
@@ -29,7 +33,12 @@ ICON = {
     "tariff_end": "mdi:calendar-end",
     "tariff_pay_left": "mdi:cash-clock",
     "pays": "mdi:receipt",
+    "service": "mdi:tag-multiple",
+    "account_balance": "mdi:currency-rub",
     "last_update": "mdi:clock-outline",
+    "refresh_duration": "mdi:timer-outline",
+    "auth_count": "mdi:login",
+    "bytes_received": "mdi:download-network",
 }
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, add_entities: AddEntitiesCallback):
@@ -51,11 +60,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, add_entitie
         MoneyNestedSensor(coordinator, entry, "tariff_pay_left", ["tariff", "pay_subscribe"], "tariff_pay_left"),
         PaymentsSensor(coordinator, entry),
         LastUpdateSensor(coordinator, entry),
+        RefreshDurationSensor(coordinator, entry),
+        AuthCountSensor(coordinator, entry),
+        BytesReceivedSensor(coordinator, entry),
     ]
     add_entities(entities)
 
+    # The fixed sensors above describe the primary service and account; any further ones come and go with the payload.
+    dynamic: dict[str, BaseUmnyeSetiSensor] = {}
+    seen: Optional[tuple] = None
+
+    @callback
+    def _sync_dynamic() -> None:
+        nonlocal seen
+        st = coordinator.data
+        if not st or not st.data:
+            return
+        services = tuple(st.data.get("services") or ())[1:]
+        accounts = tuple(st.data.get("accounts") or ())[1:]
+        if seen == (services, accounts):
+            return
+        seen = (services, accounts)
+        wanted = {f"service_{sid}": sid for sid in services}
+        wanted.update({f"account_balance_{aid}": aid for aid in accounts})
+        registry = er.async_get(hass)
+        for key in [k for k in dynamic if k not in wanted]:
+            entity = dynamic.pop(key)
+            if entity.entity_id and registry.async_get(entity.entity_id):
+                registry.async_remove(entity.entity_id)
+        new: List[SensorEntity] = []
+        for key, ident in wanted.items():
+            if key in dynamic:
+                continue
+            sensor = ServiceSensor(coordinator, entry, ident) if key.startswith("service_") else AccountBalanceSensor(coordinator, entry, ident)
+            dynamic[key] = sensor
+            new.append(sensor)
+        if new:
+            add_entities(new)
+
+    _sync_dynamic()
+    entry.async_on_unload(coordinator.async_add_listener(_sync_dynamic))
+
 class BaseUmnyeSetiSensor(CoordinatorEntity[UmnyeSetiCoordinator], SensorEntity):
     _attr_has_entity_name = True
+    # Flattened state keys or key prefixes (see diff.flatten_state) this sensor renders; empty means always write.
+    _watch: tuple[str, ...] = ()
 
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry, key: str, name_suffix: Optional[str] = None):
         super().__init__(coordinator)
@@ -71,6 +120,31 @@ class BaseUmnyeSetiSensor(CoordinatorEntity[UmnyeSetiCoordinator], SensorEntity)
         # Mark diagnostic sensors
         if suffix in ('ip', 'mac', 'vlan'):
             self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._was_available: Optional[bool] = None
+
+    async def async_added_to_hass(self) -> None:
+        self._update_attrs(self.coordinator.data)
+        await super().async_added_to_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = self.coordinator.changed
+        available = self.available
+        if (
+            changed is not None
+            and self._watch
+            and available == self._was_available
+            and not touches(changed, self._watch)
+        ):
+            return
+        self._was_available = available
+        self._update_attrs(self.coordinator.data)
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_attrs(self, st) -> None:
+        # Values are derived once per update (state.data is already rendered), so reads are plain attributes.
+        return
 
     @property
     def device_info(self):
@@ -86,32 +160,25 @@ class BaseUmnyeSetiSensor(CoordinatorEntity[UmnyeSetiCoordinator], SensorEntity)
         }
 
 class StatusSensor(BaseUmnyeSetiSensor):
+    _watch = ("error", "stale")
+
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
         super().__init__(coordinator, entry, "status", "status")
 
-    @property
-    def native_value(self):
-        st = self.coordinator.data
-        if not st:
-            return "ERROR"
-        return "ERROR" if st.error else "OK"
-
-    @property
-    def extra_state_attributes(self):
-        st = self.coordinator.data
-        return {"error": st.error if st else "no_state"}
+    @callback
+    def _update_attrs(self, st) -> None:
+        self._attr_native_value = "ERROR" if not st or st.error else "OK"
+        self._attr_extra_state_attributes = {"error": st.error if st else "no_state", "stale": st.stale if st else False}
 
 class SimpleValueSensor(BaseUmnyeSetiSensor):
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry, key: str, field: str):
         super().__init__(coordinator, entry, key)
         self._field = field
+        self._watch = (field,)
 
-    @property
-    def native_value(self):
-        st = self.coordinator.data
-        if not st or not st.data:
-            return None
-        return st.data.get(self._field)
+    @callback
+    def _update_attrs(self, st) -> None:
+        self._attr_native_value = st.data.get(self._field) if st and st.data else None
 
 class MoneyValueSensor(SimpleValueSensor):
     _attr_device_class = SensorDeviceClass.MONETARY
@@ -122,93 +189,91 @@ class NestedValueSensor(BaseUmnyeSetiSensor):
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry, key: str, path: list[str], name_suffix: str):
         super().__init__(coordinator, entry, key, name_suffix)
         self._path = path
+        self._watch = (".".join(path),)
 
-    @property
-    def native_value(self):
-        st = self.coordinator.data
-        if not st or not st.data:
-            return None
-        node: Any = st.data
+    @callback
+    def _update_attrs(self, st) -> None:
+        node: Any = st.data if st else None
         for p in self._path:
             node = node.get(p) if isinstance(node, dict) else None
-            if node is None:
-                return None
-        return node
+        self._attr_native_value = node
 
 class MoneyNestedSensor(NestedValueSensor):
     _attr_native_unit_of_measurement = "₽"
     _attr_suggested_display_precision = 2
 
 class TariffEndSensor(BaseUmnyeSetiSensor):
+    _watch = ("tariff.end_text", "tariff.end_subscribe")
+
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
         super().__init__(coordinator, entry, "tariff_end", "tariff_end")
 
-    def _lang(self) -> str:
-        lang = getattr(self.hass.config, "language", None) or "en"
-        return str(lang).lower()
-
-    def _plural_days_ru(self, n: int) -> str:
-        last = n % 10
-        last2 = n % 100
-        if last == 1 and last2 != 11:
-            suffix = "день"
-        elif 2 <= last <= 4 and not 12 <= last2 <= 14:
-            suffix = "дня"
-        else:
-            suffix = "дней"
-        return f"{n} {suffix}"
-
-    @property
-    def native_value(self):
-        st = self.coordinator.data
-        if not st or not st.data:
-            return None
-        t = st.data.get("tariff") or {}
-        days = t.get("end_days")
-        if days is None:
-            return None
-        days = int(days)
-        if days < 0:
-            return "просрочено" if self._lang().startswith("ru") else "overdue"
-        if days == 0:
-            return "сегодня" if self._lang().startswith("ru") else "today"
-        if days == 1:
-            return "завтра" if self._lang().startswith("ru") else "tomorrow"
-        return self._plural_days_ru(days) if self._lang().startswith("ru") else f"{days} days"
-
-    @property
-    def extra_state_attributes(self):
-        st = self.coordinator.data
-        if not st or not st.data:
-            return None
-        t = st.data.get("tariff") or {}
-        return {"scheduled_end": t.get("end_subscribe")}
+    @callback
+    def _update_attrs(self, st) -> None:
+        t = (st.data.get("tariff") or {}) if st and st.data else None
+        self._attr_native_value = t.get("end_text") if t else None
+        self._attr_extra_state_attributes = {"scheduled_end": t.get("end_subscribe")} if t is not None else None
 
 class PaymentsSensor(BaseUmnyeSetiSensor):
+    _watch = ("pays", "pays_monthly", "pays_count")
+    # Full history lives in the payment ledger; keep the windowed views out of the recorder.
+    _unrecorded_attributes = frozenset({"pays", "monthly"})
+    _attr_native_value = "Открыть"
+
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
         super().__init__(coordinator, entry, "pays", "pays")
+        self._attr_icon = "mdi:credit-card-outline"
+
+    @callback
+    def _update_attrs(self, st) -> None:
+        pays = st.data.get("pays") if st and st.data else None
+        if pays is None:
+            self._attr_extra_state_attributes = None
+            return
+        self._attr_extra_state_attributes = {
+            "pays": pays,
+            "monthly": st.data.get("pays_monthly") or {},
+            "count": st.data.get("pays_count") or 0,
+        }
 
-    @property
-    def native_value(self):
-        return "Открыть"
+class ServiceSensor(BaseUmnyeSetiSensor):
+    _FIELDS = ("name", "speed", "amount", "period", "end_subscribe", "end_days", "end_text")
 
-    @property
-    def extra_state_attributes(self):
-        pays = self._get_pays()
-        return {"pays": pays} if pays is not None else None
+    def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry, service_id: str):
+        super().__init__(coordinator, entry, "service", f"service_{service_id}")
+        self._service_id = service_id
+        self._attr_translation_key = "service"
+        self._attr_translation_placeholders = {"service": service_id}
+        self._attr_icon = ICON["service"]
+        self._watch = tuple(f"services.{service_id}.{f}" for f in self._FIELDS)
 
-    @property
-    def icon(self):
-        return "mdi:credit-card-outline"
+    @callback
+    def _update_attrs(self, st) -> None:
+        serv = ((st.data.get("services") or {}).get(self._service_id) if st and st.data else None) or {}
+        self._attr_native_value = serv.get("name")
+        self._attr_extra_state_attributes = {f: serv.get(f) for f in self._FIELDS[1:]} if serv else None
 
+class AccountBalanceSensor(BaseUmnyeSetiSensor):
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement = 'RUB'
+    _attr_suggested_display_precision = 2
 
-    def _get_pays(self):
-        st = self.coordinator.data
-        if not st or not st.data:
-            return None
-        return st.data.get("pays")
+    def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry, account_id: str):
+        super().__init__(coordinator, entry, "account_balance", f"account_balance_{account_id}")
+        self._account_id = account_id
+        self._attr_translation_key = "account_balance"
+        self._attr_translation_placeholders = {"account": account_id}
+        self._attr_icon = ICON["account_balance"]
+        self._watch = (f"accounts.{account_id}.balance",)
+
+    @callback
+    def _update_attrs(self, st) -> None:
+        acc = (st.data.get("accounts") or {}).get(self._account_id) if st and st.data else None
+        self._attr_native_value = acc.get("balance") if acc else None
 
 class LastUpdateSensor(BaseUmnyeSetiSensor):
+    _watch = ("last_attempt",)
+
     def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
         super().__init__(coordinator, entry, "last_update", "last_update")
         self._attr_device_class = SensorDeviceClass.TIMESTAMP
@@ -235,3 +300,70 @@ class LastUpdateSensor(BaseUmnyeSetiSensor):
     @property
     def native_value(self):
         return self._last_attempt
+
+class MetricSensor(BaseUmnyeSetiSensor):
+    # Refresh metrics change on every poll, even when the payload does not; they follow the metrics signal.
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self.coordinator.metrics_signal, self.async_write_ha_state))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        return
+
+class RefreshDurationSensor(MetricSensor):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
+        super().__init__(coordinator, entry, "refresh_duration", "refresh_duration")
+
+    @property
+    def native_value(self):
+        last = self.coordinator.metrics.last("refresh")
+        return round(last * 1000, 1) if last is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            name: hist.summary()
+            for name, hist in self.coordinator.metrics.phases.items()
+            if name != "refresh"
+        }
+
+class AuthCountSensor(MetricSensor):
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
+        super().__init__(coordinator, entry, "auth_count", "auth_count")
+
+    @property
+    def native_value(self):
+        return self.coordinator.metrics.auth_count
+
+class BytesReceivedSensor(MetricSensor):
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: UmnyeSetiCoordinator, entry: ConfigEntry):
+        super().__init__(coordinator, entry, "bytes_received", "bytes_received")
+
+    @property
+    def native_value(self):
+        return self.coordinator.metrics.bytes_received
+
+    @property
+    def extra_state_attributes(self):
+        m = self.coordinator.metrics
+        return {
+            "bytes_wire": m.bytes_wire,
+            "tls_handshakes": m.tls_handshakes,
+            "handshakes_avoided": m.handshakes_avoided,
+        }
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import asyncio
+import time
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from .const import DOMAIN, SERVICE_REFRESH, ATTR_ENTRY_ID, REFRESH_ALL, SERVICE_REFRESH_MIN_GAP
+from .coordinator import UmnyeSetiCoordinator
+from .hub import async_get_hub
+
+REFRESH_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+})
+
+def _targets(hass: HomeAssistant, call: ServiceCall) -> list[str]:
+    members = async_get_hub(hass).members
+    entry_ids = call.data.get(ATTR_ENTRY_ID) or []
+    device_ids = call.data.get(ATTR_DEVICE_ID) or []
+    if (not entry_ids and not device_ids) or REFRESH_ALL in entry_ids:
+        return list(members)
+    targets = []
+    for entry_id in entry_ids:
+        if entry_id not in members:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="unknown_entry", translation_placeholders={"id": entry_id})
+        targets.append(entry_id)
+    registry = dr.async_get(hass)
+    for device_id in device_ids:
+        device = registry.async_get(device_id)
+        found = [e for e in device.config_entries if e in members] if device else []
+        if not found:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="unknown_device", translation_placeholders={"id": device_id})
+        targets.extend(found)
+    return list(dict.fromkeys(targets))
+
+def _summary(coordinator: UmnyeSetiCoordinator, status: str, duration: float | None = None) -> dict:
+    state = coordinator.data
+    error = state.error if state is not None else None
+    if status == "refreshed" and error:
+        status = "failed"
+    return {
+        "title": getattr(coordinator.config_entry, "title", None),
+        "status": status,
+        "duration_ms": round(duration * 1000, 1) if duration is not None else None,
+        "error": error,
+        "last_attempt": state.last_attempt if state is not None else None,
+        "stale": bool(state.stale) if state is not None else None,
+    }
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(DOMAIN, SERVICE_REFRESH):
+        return
+
+    async def _refresh(call: ServiceCall) -> ServiceResponse:
+        hub = async_get_hub(hass)
+        targets = _targets(hass, call)
+        # Bulk calls go through at most max_concurrency entries at a time; the hub slot still bounds the portal.
+        workers = asyncio.Semaphore(hub.max_concurrency)
+        results: dict[str, dict] = {}
+
+        async def _one(entry_id: str) -> None:
+            coordinator = hub.members.get(entry_id)
+            if coordinator is None:
+                results[entry_id] = {"status": "not_loaded"}
+                return
+            async with workers:
+                since = hub.since_refresh(entry_id)
+                if not hub.refreshing(entry_id) and since is not None and since < SERVICE_REFRESH_MIN_GAP:
+                    results[entry_id] = {**_summary(coordinator, "rate_limited"),
+                                         "retry_after": round(SERVICE_REFRESH_MIN_GAP - since, 1)}
+                    return
+                started = time.perf_counter()
+                task, joined = hub.refresh(coordinator)
+                # Shielded: a cancelled service call must not cancel a refresh other callers may be waiting on.
+                await asyncio.shield(task)
+                results[entry_id] = _summary(coordinator, "coalesced" if joined else "refreshed", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_one(entry_id) for entry_id in targets))
+        return {
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "entries": {entry_id: results[entry_id] for entry_id in targets},
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, _refresh, schema=REFRESH_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
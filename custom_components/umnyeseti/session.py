@@ -0,0 +1,185 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from aiohttp import ClientSession
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import UmnyeSetiApi
+from .breaker import CircuitBreaker, CLOSED
+from .metrics import RefreshMetrics
+from .const import DOMAIN, SESSION_RENEW_MARGIN, SESSION_MIN_TTL, SESSION_TTL_ALPHA
+
+_LOGGER = logging.getLogger(__name__)
+
+def _auth_ok(resp) -> bool:
+    return bool(resp) and not (isinstance(resp, dict) and resp.get("error"))
+
+class SessionManager:
+    def __init__(self, hass: HomeAssistant, session: ClientSession, api: UmnyeSetiApi,
+                 login: str, password: str, slot: Callable, name: str, breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[RefreshMetrics] = None):
+        self.hass = hass
+        self._session = session
+        self._api = api
+        self._login = login
+        self._password = password
+        self._slot = slot
+        self._name = name
+        self._breaker = breaker
+        self._metrics = metrics
+        self._inflight: Optional[asyncio.Task] = None
+        self._seen: dict[str, tuple[str, Optional[float]]] = {}
+        self._logged_in_at: Optional[float] = None
+        self._learned_ttl: Optional[float] = None
+        self._unsub_renew: Optional[CALLBACK_TYPE] = None
+        self._scheduled_for: Optional[float] = None
+        self._next_poll: Optional[float] = None
+        self._poll_interval: Optional[float] = None
+
+    def _observe_cookies(self) -> None:
+        # The jar is per account, so every cookie in it belongs to the portal.
+        now = time.time()
+        seen: dict[str, tuple[str, Optional[float]]] = {}
+        for morsel in self._session.cookie_jar:
+            prev = self._seen.get(morsel.key)
+            if prev and prev[0] == morsel.value:
+                seen[morsel.key] = prev
+                continue
+            # max-age is relative, so anchor it to the moment this value first appeared.
+            expires_at: Optional[float] = None
+            try:
+                if morsel["max-age"]:
+                    expires_at = now + int(morsel["max-age"])
+                elif morsel["expires"]:
+                    expires_at = parsedate_to_datetime(morsel["expires"]).timestamp()
+            except Exception:
+                expires_at = None
+            seen[morsel.key] = (morsel.value, expires_at)
+        self._seen = seen
+
+    def expires_at(self) -> Optional[float]:
+        expiries = [exp for _, exp in self._seen.values() if exp is not None]
+        if self._logged_in_at is not None and self._learned_ttl is not None:
+            expiries.append(self._logged_in_at + self._learned_ttl)
+        return min(expiries) if expiries else None
+
+    def _observe_ttl(self, j) -> None:
+        if self._logged_in_at is None:
+            return
+        age = time.time() - self._logged_in_at
+        if isinstance(j, dict) and j.get("error") in ("unauthorized", "invalid_json"):
+            # An estimate, not a bound: one early rejection (e.g. a portal deploy) must not pin it forever.
+            if age >= SESSION_MIN_TTL:
+                self._learned_ttl = age if self._learned_ttl is None else (
+                    SESSION_TTL_ALPHA * age + (1 - SESSION_TTL_ALPHA) * self._learned_ttl)
+        elif self._learned_ttl is not None and age > self._learned_ttl and not (isinstance(j, dict) and j.get("error")):
+            # The session outlived the estimate; forget it until the portal rejects us again.
+            self._learned_ttl = None
+
+    async def async_fetch(self):
+        j = await self._api.fetch_json()
+        self._observe_cookies()
+        self._observe_ttl(j)
+        if self._logged_in_at is not None and self.expires_at() != self._scheduled_for:
+            # Sliding sessions: the portal may extend the cookie on every request.
+            self._schedule_renewal()
+        return j
+
+    @callback
+    def async_poll_scheduled(self, due: float, interval: float) -> None:
+        # Called by the hub whenever the next poll of this entry is planned (wall-clock time).
+        self._next_poll = due
+        self._poll_interval = interval
+        self._schedule_renewal()
+
+    @callback
+    def async_adopt(self, logged_in_at: float) -> None:
+        # The jar already holds a session obtained elsewhere (config flow); track it as our own login.
+        self._logged_in_at = logged_in_at
+        self._seen = {}
+        self._observe_cookies()
+        self._schedule_renewal()
+
+    async def async_login(self):
+        # All concurrent callers share a single in-flight login.
+        if self._inflight is None or self._inflight.done():
+            self._inflight = self.hass.async_create_task(self._async_do_login(), f"{DOMAIN} login {self._name}")
+        return await asyncio.shield(self._inflight)
+
+    async def _async_do_login(self):
+        resp = await self._api.auth(self._login, self._password)
+        if self._metrics is not None:
+            self._metrics.auth_count += 1
+        if _auth_ok(resp):
+            self._logged_in_at = time.time()
+            self._seen = {}
+            self._observe_cookies()
+            self._schedule_renewal()
+        return resp
+
+    @callback
+    def _schedule_renewal(self) -> None:
+        self._cancel_renewal()
+        self._scheduled_for = self.expires_at()
+        renew_at = self.renewal_due()
+        if renew_at is None:
+            return
+        delay = max(renew_at - time.time(), 0)
+        logged_in_at = self._logged_in_at
+
+        @callback
+        def _renew(_now) -> None:
+            self._unsub_renew = None
+            self.hass.async_create_background_task(
+                self._async_renew(logged_in_at), f"{DOMAIN} session renewal {self._name}")
+
+        self._unsub_renew = async_call_later(self.hass, delay, _renew)
+
+    def renewal_due(self) -> Optional[float]:
+        # Renewing only pays off when the session would be dead by the next poll; then log in just ahead
+        # of that poll, and at most once per poll interval. Otherwise the poll itself keeps using the session.
+        expires_at = self.expires_at()
+        now = time.time()
+        if expires_at is None or self._logged_in_at is None or self._next_poll is None or self._next_poll <= now:
+            return None
+        if self._next_poll < expires_at - SESSION_RENEW_MARGIN:
+            return None
+        renew_at = max(self._next_poll - SESSION_RENEW_MARGIN, now + SESSION_MIN_TTL)
+        if renew_at >= self._next_poll:
+            return None
+        # A login at the previous poll is up to a margin later than renew_at would be; anything newer is this interval's.
+        if self._poll_interval and renew_at - self._logged_in_at < self._poll_interval - SESSION_RENEW_MARGIN:
+            return None
+        return renew_at
+
+    async def _async_renew(self, logged_in_at: Optional[float]) -> None:
+        if self._breaker is not None and self._breaker.state != CLOSED:
+            return
+        async with self._slot():
+            # Someone else already logged in while we waited for a slot.
+            if self._logged_in_at != logged_in_at:
+                return
+            try:
+                resp = await self.async_login()
+            except Exception as e:
+                _LOGGER.debug("%s: proactive session renewal failed: %s", DOMAIN, e)
+                return
+        if not _auth_ok(resp):
+            _LOGGER.debug("%s: proactive session renewal rejected: %s", DOMAIN, resp)
+
+    @callback
+    def _cancel_renewal(self) -> None:
+        if self._unsub_renew:
+            self._unsub_renew()
+            self._unsub_renew = None
+
+    @callback
+    def async_close(self) -> None:
+        self._cancel_renewal()
+        if self._inflight is not None and not self._inflight.done():
+            self._inflight.cancel()
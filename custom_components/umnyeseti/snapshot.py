@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import SNAPSHOT_SAVE_DELAY
+from .storage import EntryStore
+
+class StateSnapshot(EntryStore):
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        super().__init__(hass, "snapshot", entry_id, SNAPSHOT_SAVE_DELAY)
+        self._latest: dict = {}
+
+    async def async_load(self) -> Optional[dict]:
+        data = await self._async_read()
+        if not isinstance(data, dict) or not isinstance(data.get("data"), dict):
+            return None
+        return data
+
+    def _payload(self) -> dict:
+        return self._latest
+
+    @callback
+    def async_schedule_save(self, data: dict, last_attempt: Optional[str]) -> None:
+        self._latest = {"data": data, "last_attempt": last_attempt}
+        self._mark_dirty()
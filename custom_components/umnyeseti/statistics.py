@@ -0,0 +1,102 @@
+from __future__ import annotations
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .const import DOMAIN, CURRENCY
+from .model import parse_iso
+
+_LOGGER = logging.getLogger(__name__)
+
+def _hour(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+class StatisticsImporter:
+    # Balance as an hourly mean and payments as a cumulative sum, as external statistics of this integration.
+    def __init__(self, hass: HomeAssistant, login: str, title: str):
+        self.hass = hass
+        slug = slugify(login)
+        self.balance_id = f"{DOMAIN}:balance_{slug}"
+        self.payments_id = f"{DOMAIN}:payments_{slug}"
+        self._title = title
+        self._loaded = False
+        self._last_start: Optional[datetime] = None
+        self._last_sum = 0.0
+        self._balance: Optional[tuple[datetime, float]] = None
+
+    def _meta(self, statistic_id: str, name: str, has_mean: bool, has_sum: bool) -> StatisticMetaData:
+        return StatisticMetaData(
+            has_mean=has_mean,
+            has_sum=has_sum,
+            name=f"{self._title} {name}",
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=CURRENCY)
+
+    async def _async_load(self) -> None:
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, self.payments_id, True, {"sum"})
+        rows = last.get(self.payments_id) or []
+        if rows:
+            self._last_start = datetime.fromtimestamp(rows[0]["start"], timezone.utc)
+            self._last_sum = float(rows[0].get("sum") or 0.0)
+        self._loaded = True
+
+    async def async_import(self, balance: Optional[float], rows: list[dict], new_rows: list[dict]) -> None:
+        if "recorder" not in self.hass.config.components:
+            return
+        try:
+            if not self._loaded:
+                await self._async_load()
+            self._import_balance(balance)
+            self._import_payments(rows, new_rows)
+        except Exception as e:
+            _LOGGER.debug("%s: failed to import statistics: %s", DOMAIN, e)
+
+    def _import_balance(self, balance: Optional[float]) -> None:
+        if balance is None:
+            return
+        hour = _hour(datetime.now(timezone.utc))
+        if self._balance == (hour, balance):
+            return
+        self._balance = (hour, balance)
+        async_add_external_statistics(
+            self.hass, self._meta(self.balance_id, "balance", True, False),
+            [StatisticData(start=hour, mean=balance, min=balance, max=balance)])
+
+    def _import_payments(self, rows: list[dict], new_rows: list[dict]) -> None:
+        if self._last_start is None:
+            # First run: backfill the whole ledger.
+            todo, total = rows, 0.0
+        else:
+            todo = [r for r in new_rows if r.get("amount") is not None]
+            if not todo:
+                return
+            hours = [_hour(dt) for dt in (parse_iso(r["iso"]) for r in todo) if dt is not None]
+            if hours and min(hours) <= self._last_start:
+                # A payment landed in an hour that was already imported; rebuild the running sum.
+                todo, total = rows, 0.0
+            else:
+                total = self._last_sum
+        buckets: dict[datetime, float] = {}
+        for r in todo:
+            dt = parse_iso(r["iso"])
+            if dt is None or r.get("amount") is None:
+                continue
+            hour = _hour(dt)
+            buckets[hour] = buckets.get(hour, 0.0) + r["amount"]
+        if not buckets:
+            return
+        stats: list[StatisticData] = []
+        for hour in sorted(buckets):
+            total = round(total + buckets[hour], 2)
+            stats.append(StatisticData(start=hour, state=buckets[hour], sum=total))
+        async_add_external_statistics(self.hass, self._meta(self.payments_id, "payments", False, True), stats)
+        self._last_start = stats[-1]["start"]
+        self._last_sum = total
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Every per-entry store is .storage/umnyeseti_<kind>_<entry_id>; removing an entry removes all of them.
+STORE_KINDS = ("cookies", "ledger", "snapshot", "events")
+
+def store_key(kind: str, entry_id: str) -> str:
+    return f"{DOMAIN}_{kind}_{entry_id}"
+
+class EntryStore(ABC):
+    # Debounced saves while running, one final write on unload. Subclasses provide _payload().
+    def __init__(self, hass: HomeAssistant, kind: str, entry_id: str, save_delay: float):
+        self.hass = hass
+        self._kind = kind
+        self._save_delay = save_delay
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, store_key(kind, entry_id))
+        self._dirty = False
+
+    async def _async_read(self) -> Any:
+        try:
+            return await self._store.async_load()
+        except Exception as e:
+            _LOGGER.debug("%s: failed to load %s: %s", DOMAIN, self._kind, e)
+            return None
+
+    @abstractmethod
+    def _payload(self) -> dict:
+        # The JSON-serialisable data to write.
+        ...
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._dirty = False
+        return self._payload()
+
+    @callback
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, self._save_delay)
+
+    async def async_flush(self) -> None:
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+async def async_remove_stores(hass: HomeAssistant, entry_id: str) -> None:
+    for kind in STORE_KINDS:
+        await Store(hass, STORAGE_VERSION, store_key(kind, entry_id)).async_remove()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import Optional
+
+from aiohttp import ClientTimeout
+
+from .const import (
+    TIMEOUT_DEFAULT_CONNECT,
+    TIMEOUT_DEFAULT_READ,
+    TIMEOUT_DEFAULT_TOTAL,
+    TIMEOUT_MIN_SAMPLES,
+    TIMEOUT_PERCENTILE,
+    TIMEOUT_SAFETY_FACTOR,
+    TIMEOUT_MIN_CONNECT,
+    TIMEOUT_MIN_TOTAL,
+    TIMEOUT_MAX_TOTAL)
+from .metrics import RefreshMetrics, kind_phase
+
+# Request kinds, named after the metrics phase that times them.
+KINDS = ("login_page", "login_post", "fetch")
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high)
+
+class AdaptiveTimeouts:
+    # Per-request budgets learned from this account's own latencies, each kind from its own samples.
+    # A stalled request is cut after a few times the usual p95 instead of a fixed 15 s; timed-out and
+    # failed attempts are recorded as well (phase timer and on_request_exception), so the budgets widen
+    # again on slow days.
+    def __init__(self, metrics: Optional[RefreshMetrics] = None, connect: Optional[float] = None,
+                 read: Optional[float] = None, total: Optional[float] = None):
+        self._metrics = metrics
+        # Explicit overrides (options flow); None or 0 means adaptive.
+        self._connect = connect or None
+        self._read = read or None
+        self._total = total or None
+
+    def _learned(self, phase: str) -> Optional[float]:
+        if self._metrics is None:
+            return None
+        hist = self._metrics.phases.get(phase)
+        if hist is None or len(hist) < TIMEOUT_MIN_SAMPLES:
+            return None
+        return hist.percentile(TIMEOUT_PERCENTILE) * TIMEOUT_SAFETY_FACTOR
+
+    def _learned_for(self, kind: str, phase: str) -> Optional[float]:
+        # A kind that rarely opens its own connection (fetch on a pooled one) borrows the shared samples.
+        learned = self._learned(kind_phase(kind, phase))
+        return learned if learned is not None else self._learned(phase)
+
+    def budgets(self, kind: str) -> dict[str, float]:
+        total = self._total
+        if total is None:
+            learned = self._learned(kind)
+            total = _clamp(learned, TIMEOUT_MIN_TOTAL, TIMEOUT_MAX_TOTAL) if learned is not None else TIMEOUT_DEFAULT_TOTAL
+        connect = self._connect
+        if connect is None:
+            learned = self._learned_for(kind, "connect")
+            connect = _clamp(learned, TIMEOUT_MIN_CONNECT, total) if learned is not None else min(TIMEOUT_DEFAULT_CONNECT, total)
+        read = self._read
+        if read is None:
+            # "server" is headers-sent to response headers (or to the failure), the wait sock_read has to cover.
+            learned = self._learned_for(kind, "server")
+            read = _clamp(learned, TIMEOUT_MIN_TOTAL, total) if learned is not None else min(TIMEOUT_DEFAULT_READ, total)
+        return {"connect": round(connect, 2), "sock_read": round(read, 2), "total": round(total, 2)}
+
+    def get(self, kind: str) -> ClientTimeout:
+        b = self.budgets(kind)
+        # sock_connect rather than connect: waiting for a pooled connection is not the portal's fault.
+        return ClientTimeout(total=b["total"], sock_connect=b["connect"], sock_read=b["sock_read"])
+
+    def as_dict(self) -> dict:
+        return {kind: self.budgets(kind) for kind in KINDS}
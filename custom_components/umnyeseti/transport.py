@@ -0,0 +1,207 @@
+from __future__ import annotations
+import asyncio
+import base64
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, Optional, Protocol
+
+from aiohttp import ClientSession
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+CASSETTE_VERSION = 1
+
+# Payload fields that identify the subscriber; replaced before a cassette is written.
+# Every scalar under REDACT_TREES is replaced too, keeping the structure (and so the decoder) intact.
+# Not n_*_id in general: n_serv_id and n_addr_type_id are catalogue keys the decoder indexes by.
+REDACT_KEYS = frozenset({"vc_account", "vc_code", "n_person_id", "n_account_id"})
+REDACT_TREES = frozenset({"person"})
+REDACTED = "**REDACTED**"
+# Cookies are secrets; the body is stored decoded and possibly redacted, so length/encoding no longer apply.
+_DROP_HEADERS = frozenset({"set-cookie", "cookie", "content-length", "content-encoding", "transfer-encoding"})
+_TOKEN_VALUE_RE = re.compile(rb'(name=["\']authenticity_token["\'][^>]+value=["\'])([^"\']+)', re.I)
+
+class Transport(Protocol):
+    # The slice of aiohttp's request API that UmnyeSetiApi uses; responses expose status, headers,
+    # content_type, content_length, content (iter_chunked/readany), read(), get_encoding() and close().
+    def request(self, method: str, url: str, **kwargs): ...
+
+class AiohttpTransport:
+    def __init__(self, session: ClientSession):
+        self._session = session
+
+    def request(self, method: str, url: str, **kwargs):
+        return self._session.request(method, url, **kwargs)
+
+def redact_body(body: bytes, content_type: str) -> bytes:
+    if "json" in content_type:
+        try:
+            return json.dumps(_redact(json.loads(body)), ensure_ascii=False).encode("utf-8")
+        except ValueError:
+            return body
+    if "html" in content_type:
+        return _TOKEN_VALUE_RE.sub(rb"\1redacted-token", body)
+    return body
+
+def _redact(node, everything: bool = False):
+    if isinstance(node, dict):
+        return {
+            k: (REDACTED if k in REDACT_KEYS and not isinstance(v, (dict, list)) else _redact(v, everything or k in REDACT_TREES))
+            for k, v in node.items()}
+    if isinstance(node, list):
+        return [_redact(v, everything) for v in node]
+    if everything and node is not None and not isinstance(node, bool):
+        return REDACTED
+    return node
+
+class _RecordedContent:
+    def __init__(self, content, sink: list[bytes]):
+        self._content = content
+        self._sink = sink
+
+    async def iter_chunked(self, n: int):
+        async for chunk in self._content.iter_chunked(n):
+            self._sink.append(chunk)
+            yield chunk
+
+    async def readany(self) -> bytes:
+        chunk = await self._content.readany()
+        self._sink.append(chunk)
+        return chunk
+
+    def __getattr__(self, name):
+        return getattr(self._content, name)
+
+class _RecordedResponse:
+    def __init__(self, resp, sink: list[bytes]):
+        self._resp = resp
+        self._sink = sink
+        self.content = _RecordedContent(resp.content, sink)
+
+    def __getattr__(self, name):
+        return getattr(self._resp, name)
+
+    async def read(self) -> bytes:
+        body = await self._resp.read()
+        self._sink.append(body)
+        return body
+
+class RecordingTransport:
+    # Passes requests through and keeps what the API actually read, redacted, with the elapsed time.
+    def __init__(self, inner: Transport, redact: bool = True):
+        self._inner = inner
+        self._redact = redact
+        self.interactions: list[dict] = []
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator:
+        started = time.perf_counter()
+        sink: list[bytes] = []
+        async with self._inner.request(method, url, **kwargs) as resp:
+            yield _RecordedResponse(resp, sink)
+        body = b"".join(sink)
+        content_type = resp.headers.get("Content-Type", "")
+        if self._redact:
+            body = redact_body(body, content_type)
+        entry = {
+            "method": method,
+            "path": URL(url).path or "/",
+            "status": resp.status,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS},
+            "elapsed": round(time.perf_counter() - started, 6),
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode("ascii")
+        self.interactions.append(entry)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": CASSETTE_VERSION, "interactions": self.interactions}, f, ensure_ascii=False, indent=1)
+
+class _ReplayContent:
+    def __init__(self, body: bytes):
+        self._body = body
+        self._pos = 0
+
+    async def iter_chunked(self, n: int):
+        while self._pos < len(self._body):
+            chunk = self._body[self._pos:self._pos + n]
+            self._pos += len(chunk)
+            yield chunk
+
+    async def readany(self) -> bytes:
+        chunk = self._body[self._pos:]
+        self._pos = len(self._body)
+        return chunk
+
+class _ReplayResponse:
+    def __init__(self, entry: dict):
+        self.status = entry["status"]
+        self.headers = CIMultiDictProxy(CIMultiDict(entry.get("headers") or {}))
+        if "body_b64" in entry:
+            self._body = base64.b64decode(entry["body_b64"])
+        else:
+            self._body = (entry.get("body") or "").encode("utf-8")
+        self.content_length = len(self._body)
+        self.content = _ReplayContent(self._body)
+        mime = self.headers.get("Content-Type", "application/octet-stream")
+        self.content_type = mime.split(";", 1)[0].strip().lower()
+        self._charset = None
+        if "charset=" in mime:
+            self._charset = mime.split("charset=", 1)[1].split(";", 1)[0].strip()
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def get_encoding(self) -> str:
+        return self._charset or "utf-8"
+
+    def close(self) -> None:
+        pass
+
+class ReplayTransport:
+    # Answers from a cassette, in recorded order per (method, path), cycling when a queue runs out.
+    # The cursors belong to one client; give every concurrent client its own fork().
+    # timing=1.0 reproduces the recorded latencies, 0 answers immediately, other values scale them.
+    def __init__(self, interactions: Iterable[dict], timing: float = 1.0):
+        self._queues: dict[tuple[str, str], list[dict]] = {}
+        self._next: dict[tuple[str, str], int] = {}
+        for entry in interactions:
+            self._queues.setdefault((entry["method"].upper(), entry["path"]), []).append(entry)
+        self._timing = max(float(timing), 0.0)
+        self.served = 0
+
+    @classmethod
+    def load(cls, path: str, timing: float = 1.0) -> ReplayTransport:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("interactions") or [], timing)
+
+    def fork(self) -> ReplayTransport:
+        # Same cassette, own cursors: concurrent clients must not consume each other's responses.
+        clone = ReplayTransport((), self._timing)
+        clone._queues = self._queues
+        return clone
+
+    def _entry(self, method: str, url: str) -> Optional[dict]:
+        key = (method.upper(), URL(url).path or "/")
+        queue = self._queues.get(key)
+        if not queue:
+            return None
+        i = self._next.get(key, 0)
+        self._next[key] = (i + 1) % len(queue)
+        return queue[i]
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator:
+        entry = self._entry(method, url)
+        if entry is None:
+            raise LookupError(f"no recorded response for {method} {url}")
+        if self._timing:
+            await asyncio.sleep(entry.get("elapsed", 0.0) * self._timing)
+        self.served += 1
+        yield _ReplayResponse(entry)
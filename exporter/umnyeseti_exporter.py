@@ -0,0 +1,287 @@
+"""Standalone bulk poller for Smart Networks accounts, without Home Assistant.
+
+Reads logins from a credentials file and polls them with bounded
+concurrency, reusing the integration's HA-free modules (api, model,
+presentation). Either serves the results as OpenMetrics on /metrics or
+writes them once as JSON/CSV.
+
+    python exporter/umnyeseti_exporter.py accounts.csv --listen 0.0.0.0:9877 --interval 900
+    python exporter/umnyeseti_exporter.py accounts.csv --once --format csv --output balances.csv
+
+The credentials file is CSV (login,password[,verify_ssl]; a header row is
+optional) or a JSON list of {"login", "password", "verify_ssl"} objects.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import importlib
+import io
+import json
+import logging
+import pathlib
+import random
+import ssl
+import sys
+import time
+import types
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+from aiohttp import ClientSession, CookieJar, TCPConnector, web
+
+COMPONENT = pathlib.Path(__file__).resolve().parent.parent / "custom_components" / "umnyeseti"
+
+_LOGGER = logging.getLogger("umnyeseti_exporter")
+
+def load(module: str):
+    # The package __init__ needs Home Assistant; the modules used here do not.
+    # Kept here rather than shared with benchmarks/, which is development-only.
+    pkg = "umnyeseti"
+    if pkg not in sys.modules:
+        stub = types.ModuleType(pkg)
+        stub.__path__ = [str(COMPONENT)]
+        sys.modules[pkg] = stub
+    return importlib.import_module(f"{pkg}.{module}")
+
+api_mod = load("api")
+model = load("model")
+presentation = load("presentation")
+const = load("const")
+
+@dataclass
+class Credentials:
+    login: str
+    password: str
+    verify_ssl: bool = True
+
+@dataclass
+class AccountResult:
+    login: str
+    ok: bool = False
+    error: Optional[str] = None
+    account: Optional[str] = None
+    balance: Optional[float] = None
+    tariff: Optional[str] = None
+    tariff_amount: Optional[float] = None
+    pay_left: Optional[float] = None
+    end_days: Optional[int] = None
+    last_payment: Optional[str] = None
+    duration_s: Optional[float] = None
+    updated: Optional[float] = None
+    last_success: Optional[float] = None
+
+def _truthy(value) -> bool:
+    return str(value).strip().lower() not in ("0", "false", "no", "off", "")
+
+def read_credentials(path: str) -> list[Credentials]:
+    text = pathlib.Path(path).read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        return [Credentials(str(c["login"]), str(c["password"]), _truthy(c.get("verify_ssl", True))) for c in json.loads(text)]
+    creds = []
+    for row in csv.reader(io.StringIO(text)):
+        if not row or row[0].strip().startswith("#") or row[0].strip().lower() == "login":
+            continue
+        verify = _truthy(row[2]) if len(row) > 2 else True
+        creds.append(Credentials(row[0].strip(), row[1].strip(), verify))
+    return creds
+
+class Poller:
+    def __init__(self, creds: list[Credentials], concurrency: int, base_url: str, language: str):
+        self._creds = creds
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._concurrency = max(concurrency, 1)
+        self._base_url = base_url
+        self._language = language
+        self._connectors: dict[bool, TCPConnector] = {}
+        self._sessions: dict[str, ClientSession] = {}
+        self._apis: dict[str, object] = {}
+        self.results: dict[str, AccountResult] = {c.login: AccountResult(c.login) for c in creds}
+        self.rounds = 0
+
+    def _connector(self, verify_ssl: bool) -> TCPConnector:
+        conn = self._connectors.get(verify_ssl)
+        if conn is None:
+            ctx = ssl.create_default_context()
+            if not verify_ssl:
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+            conn = self._connectors[verify_ssl] = TCPConnector(limit=self._concurrency, limit_per_host=self._concurrency, ssl=ctx)
+        return conn
+
+    def _api(self, cred: Credentials):
+        api = self._apis.get(cred.login)
+        if api is None:
+            # Shared pool, one cookie jar per login: sessions survive between rounds.
+            session = self._sessions[cred.login] = ClientSession(
+                connector=self._connector(cred.verify_ssl), connector_owner=False, cookie_jar=CookieJar())
+            # No previous payload is kept here, so a 304 would only cost a second, unconditional GET.
+            api = self._apis[cred.login] = api_mod.UmnyeSetiApi(
+                session, verify_ssl=cred.verify_ssl, base_url=self._base_url, conditional=False)
+        return api
+
+    async def _fetch(self, cred: Credentials):
+        api = self._api(cred)
+        j = await api.fetch_json()
+        if isinstance(j, dict) and j.get("error") in ("unauthorized", "invalid_json"):
+            resp = await api.auth(cred.login, cred.password)
+            if not resp or (isinstance(resp, dict) and resp.get("error")):
+                msg = resp.get("message") or resp.get("error") if isinstance(resp, dict) else "auth_failed"
+                return {"error": f"auth_failed: {msg}"}
+            j = await api.fetch_json()
+        return j
+
+    async def refresh(self, cred: Credentials) -> AccountResult:
+        async with self._semaphore:
+            res = self.results[cred.login]
+            started = time.perf_counter()
+            try:
+                j = await self._fetch(cred)
+            except Exception as e:
+                j = {"error": f"fetch_exception: {e}"}
+            res.duration_s = round(time.perf_counter() - started, 4)
+            res.updated = time.time()
+            raw = j.get("data") if isinstance(j, dict) else None
+            if not isinstance(raw, dict):
+                res.ok = False
+                res.error = str(j.get("error") if isinstance(j, dict) and j.get("error") else "no_data")
+                return res
+            # One account with an unexpected payload must not take the whole round (or the server) down.
+            try:
+                tz = datetime.now().astimezone().tzinfo
+                acc = model.decode_account(raw)
+                history = model.PaymentHistory(raw.get("activities") or [])
+                view = presentation.Presenter().render(acc, history, self._language, tz, datetime.now(tz).date())
+            except Exception as e:
+                _LOGGER.debug("%s: failed to map payload: %s", cred.login, e)
+                res.ok = False
+                res.error = f"map_exception: {e}"
+                return res
+            res.ok, res.error = True, None
+            res.account = acc.account
+            res.balance = acc.balance
+            res.tariff = acc.tariff.name
+            res.tariff_amount = acc.tariff.amount
+            res.pay_left = acc.pay_left
+            res.end_days = view["tariff"]["end_days"]
+            res.last_payment = history.rows[0]["iso"] if history.rows else None
+            res.last_success = res.updated
+            return res
+
+    async def run_round(self) -> None:
+        await asyncio.gather(*(self.refresh(c) for c in self._creds))
+        self.rounds += 1
+
+    async def run_forever(self, interval: float) -> None:
+        # Spread the first round over a short window so thousands of logins do not start at once.
+        await asyncio.sleep(random.uniform(0, min(interval, 5)))
+        while True:
+            started = time.monotonic()
+            await self.run_round()
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 1))
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            await session.close()
+        for conn in self._connectors.values():
+            await conn.close()
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+_GAUGES = (
+    ("umnyeseti_up", "Whether the last poll of the account succeeded.", None, lambda r: 1 if r.ok else 0),
+    ("umnyeseti_balance_rubles", "Personal account balance.", "rubles", lambda r: r.balance),
+    ("umnyeseti_tariff_amount_rubles", "Price of the current tariff.", "rubles", lambda r: r.tariff_amount),
+    ("umnyeseti_pay_left_rubles", "Amount missing for the next charge.", "rubles", lambda r: r.pay_left),
+    ("umnyeseti_renewal_days", "Days until the subscription ends.", "days", lambda r: r.end_days),
+    ("umnyeseti_refresh_duration_seconds", "Duration of the last poll.", "seconds", lambda r: r.duration_s),
+    ("umnyeseti_last_success_timestamp_seconds", "Time of the last successful poll.", "seconds", lambda r: r.last_success),
+)
+
+def render_openmetrics(poller: Poller) -> str:
+    lines = []
+    results = sorted(poller.results.values(), key=lambda r: r.login)
+    for name, help_text, unit, get in _GAUGES:
+        lines.append(f"# TYPE {name} gauge")
+        if unit:
+            lines.append(f"# UNIT {name} {unit}")
+        lines.append(f"# HELP {name} {help_text}")
+        for r in results:
+            value = get(r)
+            if value is not None:
+                lines.append(f'{name}{{login="{_label(r.login)}"}} {value}')
+    lines.append("# TYPE umnyeseti_poll_rounds counter")
+    lines.append("# HELP umnyeseti_poll_rounds Completed polling rounds.")
+    lines.append(f"umnyeseti_poll_rounds_total {poller.rounds}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+def dump(poller: Poller, fmt: str) -> str:
+    rows = [asdict(r) for r in sorted(poller.results.values(), key=lambda r: r.login)]
+    if fmt == "json":
+        return json.dumps(rows, indent=2, ensure_ascii=False) + "\n"
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=[f.name for f in fields(AccountResult)])
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+async def serve(poller: Poller, listen: str, interval: float) -> None:
+    host, _, port = listen.rpartition(":")
+
+    async def metrics(_request: web.Request) -> web.Response:
+        return web.Response(
+            text=render_openmetrics(poller),
+            headers={"Content-Type": "application/openmetrics-text; version=1.0.0; charset=utf-8"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host or "0.0.0.0", int(port)).start()
+    _LOGGER.info("serving /metrics on %s, %d logins every %ss", listen, len(poller.results), interval)
+    try:
+        await poller.run_forever(interval)
+    finally:
+        await runner.cleanup()
+
+async def amain(args: argparse.Namespace) -> int:
+    creds = read_credentials(args.credentials)
+    poller = Poller(creds, args.concurrency, args.base_url, args.language)
+    try:
+        if args.once:
+            await poller.run_round()
+            text = dump(poller, args.format)
+            if args.output:
+                pathlib.Path(args.output).write_text(text, encoding="utf-8")
+            else:
+                sys.stdout.write(text)
+            return 0 if all(r.ok for r in poller.results.values()) else 1
+        await serve(poller, args.listen, args.interval)
+        return 0
+    finally:
+        await poller.close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("credentials", help="CSV or JSON file with logins and passwords")
+    parser.add_argument("--concurrency", type=int, default=16, help="accounts polled at the same time")
+    parser.add_argument("--interval", type=float, default=const.DEFAULT_UPDATE_INTERVAL * 60, help="seconds between rounds")
+    parser.add_argument("--listen", default="0.0.0.0:9877", help="host:port for /metrics")
+    parser.add_argument("--once", action="store_true", help="poll every account once, dump and exit")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--output", help="file for --once (default: stdout)")
+    parser.add_argument("--language", default="ru")
+    parser.add_argument("--base-url", default=const.INIT_URL, help=argparse.SUPPRESS)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        return asyncio.run(amain(args))
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
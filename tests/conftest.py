@@ -0,0 +1,27 @@
+from __future__ import annotations
+import pathlib
+import sys
+import time
+
+import pytest
+
+# Same loader as the benchmarks: integration modules without the HA package __init__.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "benchmarks"))
+from _loader import load  # noqa: E402,F401
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    c = Clock()
+    monkeypatch.setattr(time, "time", c)
+    monkeypatch.setattr(time, "monotonic", c)
+    return c
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import asyncio
+
+from conftest import load
+
+api = load("api")
+
+class FakeContent:
+    # Hands out the given chunks as they are, whatever size the reader asks for.
+    def __init__(self, chunks: list[bytes]):
+        self._chunks = list(chunks)
+        self.served = 0
+
+    async def iter_chunked(self, n: int):
+        while self._chunks:
+            yield await self.readany()
+
+    async def readany(self) -> bytes:
+        if not self._chunks:
+            return b""
+        self.served += 1
+        return self._chunks.pop(0)
+
+PAGE = b'<form><input type="hidden" name="authenticity_token" value="tok123" /></form>'
+
+def test_scan_token_split_across_chunks():
+    cut = PAGE.index(b"authenticity") + 5
+    content = FakeContent([b"x" * 100, PAGE[:cut], PAGE[cut:], b"trailer"])
+    token, read = asyncio.run(api._scan_token(content))
+    assert token == "tok123"
+    assert read == 100 + len(PAGE)
+    assert content.served == 3
+
+def test_scan_token_gives_up_at_the_cap():
+    content = FakeContent([b"x" * 1000] * 10 + [PAGE])
+    token, read = asyncio.run(api._scan_token(content, max_bytes=3000))
+    assert token is None
+    assert read == 3000
+
+class FakeResponse:
+    def __init__(self, chunks: list[bytes], content_length: int | None = None, headers: dict | None = None):
+        self.content = FakeContent(chunks)
+        self.content_length = content_length
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def test_read_capped_refuses_declared_length_over_cap_unread():
+    resp = FakeResponse([b"x" * 10], content_length=2048)
+    assert asyncio.run(api._read_capped(resp, 1024)) is None
+    assert resp.content.served == 0
+
+def test_read_capped_stops_streaming_past_cap_without_length():
+    resp = FakeResponse([b"x" * 600] * 5)
+    assert asyncio.run(api._read_capped(resp, 1024)) is None
+    assert resp.content.served == 2
+
+def test_read_capped_returns_body_within_cap():
+    resp = FakeResponse([b'{"a":', b" 1}"], content_length=8)
+    assert asyncio.run(api._read_capped(resp, 1024)) == b'{"a": 1}'
+
+def test_release_drains_a_small_remainder():
+    resp = FakeResponse([b"x" * 500, b"x" * 500], content_length=3000)
+    assert asyncio.run(api._release(resp, 2000)) == 3000
+    assert not resp.closed
+
+def test_release_closes_instead_of_reading_a_large_remainder():
+    resp = FakeResponse([b"x" * 1000] * 100, content_length=2000 + 100_000)
+    assert asyncio.run(api._release(resp, 2000)) == 2000
+    assert resp.closed
+    assert resp.content.served == 0
+
+def test_release_closes_without_a_usable_length():
+    for resp in (FakeResponse([b"x"]), FakeResponse([b"x"], content_length=10, headers={"Content-Encoding": "gzip"})):
+        assert asyncio.run(api._release(resp, 0)) == 0
+        assert resp.closed
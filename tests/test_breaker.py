@@ -0,0 +1,142 @@
+from __future__ import annotations
+import asyncio
+import random
+
+import pytest
+
+from conftest import load
+
+breaker_mod = load("breaker")
+
+def _breaker(monkeypatch):
+    # Deterministic backoff: always the upper bound of the jittered range, i.e. the full cap.
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    return breaker_mod.CircuitBreaker("test", failure_threshold=3, base_backoff=60, max_backoff=1800)
+
+def test_opens_after_threshold_failures(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    b.record_failure()
+    b.record_failure()
+    assert b.state == breaker_mod.CLOSED and b.allow()
+    b.record_failure()
+    assert b.state == breaker_mod.OPEN
+    assert not b.allow()
+
+def test_success_resets_failure_count(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    b.record_failure()
+    b.record_failure()
+    b.record_success()
+    b.record_failure()
+    assert b.state == breaker_mod.CLOSED
+
+def test_half_open_lets_exactly_one_probe_through(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    clock.advance(61)
+    assert b.allow()
+    assert b.state == breaker_mod.HALF_OPEN
+    assert not b.allow()
+
+def test_probe_success_closes(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    clock.advance(61)
+    assert b.allow()
+    b.record_success()
+    assert b.state == breaker_mod.CLOSED
+    assert b.allow() and b.allow()
+
+def test_probe_failure_reopens_with_longer_backoff(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    first = b.open_until - clock.now
+    clock.advance(61)
+    assert b.allow()
+    b.record_failure()
+    assert b.state == breaker_mod.OPEN
+    assert b.open_until - clock.now == 2 * first
+
+def test_skipped_probe_frees_the_half_open_slot(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    clock.advance(61)
+    assert b.allow()
+    b.record_skipped()
+    assert b.state == breaker_mod.HALF_OPEN
+    assert b.allow()
+
+def test_retry_budget_allows_reserve_plus_ratio(clock):
+    budget = breaker_mod.RetryBudget(ratio=0.2, min_per_sec=0.1, window=600)
+    for _ in range(300):
+        budget.record_request()
+    spent = 0
+    while budget.try_spend():
+        spent += 1
+    assert spent == 60 + 60
+
+def test_retry_budget_refills_after_window(clock):
+    budget = breaker_mod.RetryBudget(ratio=0.2, min_per_sec=0.1, window=600)
+    while budget.try_spend():
+        pass
+    assert not budget.try_spend()
+    clock.advance(601)
+    assert budget.try_spend()
+
+def test_backoff_stays_within_half_and_full_cap(clock, monkeypatch):
+    b = breaker_mod.CircuitBreaker("test", failure_threshold=1, base_backoff=60, max_backoff=1800)
+    monkeypatch.setattr(random, "uniform", lambda low, high: low)
+    caps = [60, 120, 240, 480, 960, 1800, 1800]
+    for cap in caps:
+        b.record_failure()
+        assert b.open_until - clock.now == cap / 2
+        clock.advance(cap)
+        assert b.allow()
+
+def test_failures_while_open_count_as_one_trip(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    first = b.open_until - clock.now
+    # Requests that were already in flight when the circuit opened fail too.
+    for _ in range(27):
+        b.record_failure()
+    assert b.open_until - clock.now == first
+    assert b._trips == 1
+
+def test_is_open_does_not_take_the_probe(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    assert b.is_open
+    clock.advance(61)
+    assert not b.is_open
+    assert b.allow()
+    assert not b.allow()
+
+def test_cancelled_probe_frees_the_half_open_slot(clock, monkeypatch):
+    b = _breaker(monkeypatch)
+    for _ in range(3):
+        b.record_failure()
+    clock.advance(61)
+
+    async def probe():
+        assert b.allow()
+        with b.release_on_error():
+            await asyncio.Event().wait()
+
+    async def run():
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        assert not b.allow()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert b.state == breaker_mod.HALF_OPEN
+    assert b.allow()
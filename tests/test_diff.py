@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from conftest import load
+
+diff = load("diff")
+
+def test_touches_matches_prefixes_only_on_dots():
+    changed = frozenset({"pays_monthly.2024-06"})
+    assert diff.touches(changed, ("pays_monthly",))
+    assert not diff.touches(changed, ("pays",))
+    assert diff.touches(frozenset({"pays"}), ("pays", "pays_count"))
+    assert not diff.touches(frozenset({"balance"}), ("pays_monthly",))
+
+def test_flatten_nested_dicts():
+    assert diff.flatten({"a": 1, "b": {"c": 2, "d": {"e": 3}}, "f": [1, 2]}) == {
+        "a": 1, "b.c": 2, "b.d.e": 3, "f": [1, 2]}
+
+def test_changed_keys_in_nested_attributes():
+    old = diff.flatten({"tariff": {"name": "A", "end": {"days": 3}}, "pays_monthly": {"2024-05": 500}})
+    new = diff.flatten({"tariff": {"name": "A", "end": {"days": 2}}, "pays_monthly": {"2024-05": 500, "2024-06": 700}})
+    assert diff.changed_keys(old, new) == {"tariff.end.days", "pays_monthly.2024-06"}
+
+def test_changed_keys_added_removed_and_none():
+    assert diff.changed_keys({"a": None}, {}) == {"a"}
+    assert diff.changed_keys({}, {"a": None}) == {"a"}
+    assert diff.changed_keys({"a": 1}, {"a": 1}) == frozenset()
+
+def test_changed_keys_when_nested_dict_replaces_scalar():
+    old = diff.flatten({"net": None})
+    new = diff.flatten({"net": {"ip": "10.0.0.1"}})
+    assert diff.changed_keys(old, new) == {"net", "net.ip"}
+
+def test_flatten_state_marks_missing_state():
+    assert diff.flatten_state(None)["error"] == "no_state"
@@ -0,0 +1,36 @@
+from __future__ import annotations
+import pytest
+
+from conftest import load
+
+pytest.importorskip("homeassistant")
+events = load("events")
+
+class Emitter(events.EventEmitter):
+    # Just the dedupe logic: no Store, no bus.
+    def __init__(self):
+        self._seen = {}
+        self.fired: list[tuple[str, dict]] = []
+
+    def _mark_dirty(self) -> None:
+        pass
+
+    def _fire(self, event_type: str, data: dict) -> None:
+        self.fired.append((event_type, data))
+
+def _row(iso: str, amount: float = 500.0) -> dict:
+    return {"iso": iso, "amount": amount}
+
+def test_backfill_on_first_refresh_is_not_news():
+    e = Emitter()
+    e._payments([_row("2024-05-01T10:00:00+03:00"), _row("2024-04-01T10:00:00+03:00")])
+    assert not e.fired
+    e._payments([_row("2024-06-01T10:00:00+03:00")])
+    assert [d["total"] for _, d in e.fired] == [500.0]
+
+def test_first_top_up_of_a_new_account_fires():
+    e = Emitter()
+    e._payments([])
+    assert not e.fired
+    e._payments([_row("2024-06-01T10:00:00+03:00", 250.0)])
+    assert e.fired and e.fired[0][1]["total"] == 250.0
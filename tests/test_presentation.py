@@ -0,0 +1,59 @@
+from __future__ import annotations
+import json
+import pathlib
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from conftest import load
+
+model = load("model")
+presentation = load("presentation")
+
+RAW = json.loads((pathlib.Path(__file__).resolve().parent.parent / "benchmarks" / "payloads" / "account.json").read_text("utf-8"))
+RAW = RAW.get("data", RAW)
+UTC = timezone.utc
+MSK = timezone(timedelta(hours=3))
+
+def _render(presenter, lang="ru", tz=UTC, today=date(2024, 6, 1)):
+    account = model.decode_account(RAW)
+    return presenter.render(account, model.PaymentHistory(RAW.get("activities") or []), lang, tz, today)
+
+def test_presenter_reuses_view_for_same_key():
+    p = presentation.Presenter()
+    view = _render(p)
+    assert _render(p) is view
+    assert _render(p, lang="en") is not view
+    assert _render(p, tz=MSK) is not view
+
+def test_presenter_invalidate_and_bounded_cache():
+    p = presentation.Presenter()
+    view = _render(p)
+    p.invalidate()
+    assert _render(p) is not view
+    for day in range(1, 6):
+        _render(p, today=date(2024, 6, day))
+    assert len(p._cache) <= 4
+
+def test_local_dt_cached_per_zone():
+    presentation.local_dt.cache_clear()
+    presentation.human_dt.cache_clear()
+    iso = "2024-05-31T22:30:00+00:00"
+    view = presentation.pays_view([{"iso": iso, "amount": 1.0}, {"iso": iso, "amount": 2.0}], MSK)
+    assert [v["date"] for v in view] == ["01.06.2024, 01:30", "01.06.2024, 01:30"]
+    assert presentation.human_dt(None, MSK) is None
+    assert presentation.human_dt(iso, UTC) == "31.05.2024, 22:30"
+    assert presentation.human_dt.cache_info().hits == 1
+    assert presentation.local_dt(iso, MSK) is presentation.local_dt(iso, MSK)
+
+def test_monthly_totals_uses_local_months():
+    rows = [{"iso": "2024-05-31T22:30:00+00:00", "amount": 500.0},
+            {"iso": "2024-05-10T10:00:00+00:00", "amount": 250.5},
+            {"iso": "2024-04-10T10:00:00+00:00", "amount": 100.0}]
+    assert presentation.monthly_totals(rows, MSK, 12) == {"2024-06": 500.0, "2024-05": 250.5, "2024-04": 100.0}
+    assert presentation.monthly_totals(rows, UTC, 1) == {"2024-05": 750.5}
+
+def test_naive_timestamps_use_the_configured_zone(monkeypatch):
+    # Stand-in for homeassistant.util.dt with a configured zone that differs from the host's.
+    monkeypatch.setattr(model, "dt_util", SimpleNamespace(parse_datetime=datetime.fromisoformat, DEFAULT_TIME_ZONE=MSK))
+    assert model.parse_iso("2024-05-31T22:30:00") == datetime(2024, 5, 31, 22, 30, tzinfo=MSK)
+    assert model.parse_iso("2024-05-31T22:30:00+00:00").tzinfo == UTC
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from datetime import timedelta
+
+from conftest import load
+
+schedule = load("schedule")
+const = load("const")
+
+FLOOR = timedelta(minutes=15)
+CEILING = timedelta(hours=6)
+
+def _stable_policy(polls: int = 6):
+    policy = schedule.AdaptivePolicy(FLOOR, CEILING)
+    data = {"balance": 100.0, "tariff": {}}
+    policy.observe(data, changed=True)
+    for _ in range(polls):
+        policy.observe(data, changed=False)
+    return policy
+
+def _data(end_days, pay_subscribe=0.0):
+    return {"balance": 100.0, "tariff": {"end_days": end_days, "pay_subscribe": pay_subscribe}}
+
+def test_stable_account_backs_off_to_ceiling(clock):
+    assert _stable_policy().next_interval(_data(None)) == CEILING
+
+def test_floor_right_before_renewal_when_money_is_missing(clock):
+    policy = _stable_policy()
+    assert policy.next_interval(_data(const.ADAPTIVE_RENEWAL_DAYS, pay_subscribe=300.0)) == FLOOR
+    assert policy.next_interval(_data(1, pay_subscribe=300.0)) == FLOOR
+
+def test_floor_on_and_just_after_the_end_date(clock):
+    policy = _stable_policy()
+    assert policy.next_interval(_data(0)) == FLOOR
+    assert policy.next_interval(_data(-1)) == FLOOR
+
+def test_long_expired_account_backs_off(clock):
+    policy = _stable_policy()
+    assert policy.next_interval(_data(-2)) > FLOOR
+    assert policy.next_interval(_data(-289)) == CEILING
+
+def test_renewal_covered_by_balance_is_not_pinned(clock):
+    policy = _stable_policy()
+    assert policy.next_interval(_data(const.ADAPTIVE_RENEWAL_DAYS, pay_subscribe=0.0)) > FLOOR
+
+def test_renewal_date_caps_backoff(clock):
+    policy = _stable_policy()
+    assert policy.next_interval(_data(const.ADAPTIVE_RENEWAL_DAYS + 1)) <= timedelta(days=(const.ADAPTIVE_RENEWAL_DAYS + 1) / 4)
+
+def test_payment_pins_floor_until_it_settles(clock):
+    policy = _stable_policy()
+    policy.observe({"balance": 100.0}, changed=True, new_payments=1)
+    assert policy.next_interval(_data(None)) == FLOOR
+    clock.advance(const.ADAPTIVE_RECENT_CHANGE + 1)
+    assert policy.next_interval(_data(None)) == FLOOR  # stable poll count was reset as well
+    for _ in range(6):
+        policy.observe({"balance": 100.0}, changed=False)
+    assert policy.next_interval(_data(None)) == CEILING
@@ -0,0 +1,173 @@
+from __future__ import annotations
+import asyncio
+import sys
+import types
+from typing import Any, Callable
+
+import pytest
+
+from conftest import load
+
+def _stub_homeassistant() -> None:
+    # Only so that session.py imports without HA; the scheduler itself is patched per test below.
+    try:
+        import homeassistant.core  # noqa: F401
+        import homeassistant.helpers.event  # noqa: F401
+        return
+    except ImportError:
+        pass
+    ha = types.ModuleType("homeassistant")
+    core = types.ModuleType("homeassistant.core")
+    core.HomeAssistant = Any
+    core.CALLBACK_TYPE = Callable[[], None]
+    core.callback = lambda func: func
+    helpers = types.ModuleType("homeassistant.helpers")
+    event = types.ModuleType("homeassistant.helpers.event")
+    event.async_call_later = None
+    ha.core, ha.helpers, helpers.event = core, helpers, event
+    sys.modules.update({
+        "homeassistant": ha,
+        "homeassistant.core": core,
+        "homeassistant.helpers": helpers,
+        "homeassistant.helpers.event": event,
+    })
+
+_stub_homeassistant()
+session_mod = load("session")
+const = load("const")
+
+MARGIN = const.SESSION_RENEW_MARGIN
+INTERVAL = 900
+
+@pytest.fixture(autouse=True)
+def _scheduler(monkeypatch):
+    # Real HA's async_call_later needs hass.loop; FakeHass only records the delays.
+    monkeypatch.setattr(session_mod, "async_call_later", lambda hass, delay, action: hass.call_later(delay, action))
+
+class FakeHass:
+    def __init__(self):
+        self.timers: list[float] = []
+
+    def call_later(self, delay, action):
+        self.timers.append(delay)
+        return lambda: self.timers.remove(delay)
+
+    def async_create_task(self, coro, name=None):
+        return asyncio.get_running_loop().create_task(coro, name=name)
+
+class FakeApi:
+    def __init__(self, responses):
+        self._responses = list(responses)
+        self.auth_calls = 0
+
+    async def fetch_json(self):
+        return self._responses.pop(0)
+
+    async def auth(self, login, password):
+        self.auth_calls += 1
+        await asyncio.sleep(0)
+        return {"ok": True}
+
+def _manager(api=None):
+    session = types.SimpleNamespace(cookie_jar=[])
+    return session_mod.SessionManager(FakeHass(), session, api or FakeApi([]), "login", "secret",
+                                      slot=None, name="test")
+
+UNAUTHORIZED = {"error": "unauthorized"}
+OK = {"data": {}}
+
+def test_ttl_is_learned_from_rejection(clock):
+    m = _manager()
+    m._logged_in_at = clock.now - 600
+    m._observe_ttl(UNAUTHORIZED)
+    assert m._learned_ttl == 600
+
+def test_ttl_grows_again_after_an_early_rejection(clock):
+    m = _manager()
+    m._logged_in_at = clock.now - 120
+    m._observe_ttl(UNAUTHORIZED)
+    m._logged_in_at = clock.now - 1800
+    m._observe_ttl(UNAUTHORIZED)
+    assert m._learned_ttl > 120
+    assert m._learned_ttl == pytest.approx(const.SESSION_TTL_ALPHA * 1800 + (1 - const.SESSION_TTL_ALPHA) * 120)
+
+def test_rejections_shorter_than_min_ttl_are_ignored(clock):
+    m = _manager()
+    m._logged_in_at = clock.now - (const.SESSION_MIN_TTL - 1)
+    m._observe_ttl(UNAUTHORIZED)
+    assert m._learned_ttl is None
+
+def test_success_past_the_estimate_resets_it(clock):
+    m = _manager()
+    m._learned_ttl = 300
+    m._logged_in_at = clock.now - 200
+    m._observe_ttl(OK)
+    assert m._learned_ttl == 300
+    clock.advance(200)
+    m._observe_ttl(OK)
+    assert m._learned_ttl is None
+
+def test_fetch_feeds_the_estimate(clock):
+    m = _manager(FakeApi([UNAUTHORIZED]))
+    m._logged_in_at = clock.now - 400
+    assert asyncio.run(m.async_fetch()) == UNAUTHORIZED
+    assert m._learned_ttl == 400
+
+def _logged_in(clock, ttl: float):
+    m = _manager()
+    m._logged_in_at = clock.now
+    m._learned_ttl = ttl
+    return m
+
+def test_no_renewal_when_the_poll_comes_before_expiry(clock):
+    m = _logged_in(clock, ttl=1800)
+    m.async_poll_scheduled(clock.now + INTERVAL, INTERVAL)
+    assert m.renewal_due() is None
+    assert not m.hass.timers
+
+def test_renewal_just_ahead_of_the_poll_when_the_session_dies_first(clock):
+    m = _logged_in(clock, ttl=300)
+    due = clock.now + INTERVAL
+    m.async_poll_scheduled(due, INTERVAL)
+    assert m.renewal_due() == due - MARGIN
+    assert m.hass.timers == [INTERVAL - MARGIN]
+
+def test_at_most_one_renewal_per_poll_interval(clock):
+    m = _logged_in(clock, ttl=300)
+    # Renewed moments ago for this poll; a sliding-cookie reschedule must not log in again before it.
+    m.async_poll_scheduled(clock.now + MARGIN + 30, INTERVAL)
+    assert m.renewal_due() is None
+    assert not m.hass.timers
+
+def test_no_renewal_without_a_scheduled_poll(clock):
+    m = _logged_in(clock, ttl=300)
+    assert m.renewal_due() is None
+    m.async_poll_scheduled(clock.now - 1, INTERVAL)
+    assert m.renewal_due() is None
+
+def test_short_ttl_never_renews_more_often_than_polls(clock):
+    m = _logged_in(clock, ttl=const.SESSION_MIN_TTL)
+    logins = [clock.now]
+    for _ in range(10):
+        due = clock.now + INTERVAL
+        m.async_poll_scheduled(due, INTERVAL)
+        # Sliding cookies reschedule after every fetch; that must not add logins either.
+        m._schedule_renewal()
+        renew_at = m.renewal_due()
+        if renew_at is not None:
+            logins.append(renew_at)
+            m._logged_in_at = renew_at
+        clock.now = due
+    assert len(logins) == 11
+    assert min(b - a for a, b in zip(logins, logins[1:])) >= INTERVAL - MARGIN
+
+def test_concurrent_logins_share_one_auth(clock):
+    api = FakeApi([])
+    m = _manager(api)
+
+    async def run():
+        return await asyncio.gather(*(m.async_login() for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"ok": True}] * 5
+    assert api.auth_calls == 1
+    assert m._logged_in_at == clock.now
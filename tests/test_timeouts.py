@@ -0,0 +1,53 @@
+from __future__ import annotations
+import asyncio
+import time
+from types import SimpleNamespace
+
+from conftest import load
+
+metrics = load("metrics")
+timeouts = load("timeouts")
+
+PARAMS = SimpleNamespace(url=SimpleNamespace(scheme="https"))
+
+def _request(trace, clock, kind: str, wait: float, fail: bool = False) -> None:
+    # Drive the trace hooks the way aiohttp would for one request that waits `wait` for its response.
+    ctx = SimpleNamespace(trace_request_ctx={"kind": kind})
+    asyncio.run(trace.on_request_start[0](None, ctx, PARAMS))
+    asyncio.run(trace.on_request_headers_sent[0](None, ctx, PARAMS))
+    clock.advance(wait)
+    hook = trace.on_request_exception if fail else trace.on_request_end
+    asyncio.run(hook[0](None, ctx, PARAMS))
+
+def test_timed_out_requests_widen_only_their_kind(clock, monkeypatch):
+    monkeypatch.setattr(time, "perf_counter", clock)
+    m = metrics.RefreshMetrics()
+    t = timeouts.AdaptiveTimeouts(m)
+    trace = m.trace_config()
+    for kind in ("login_page", "fetch"):
+        for _ in range(10):
+            _request(trace, clock, kind, 0.5)
+            m.record(kind, 0.6)
+    before = t.budgets("fetch")
+    assert before["sock_read"] == 5.0
+
+    for _ in range(10):
+        _request(trace, clock, "fetch", 5.0, fail=True)
+        m.record("fetch", 5.0)
+    after = t.budgets("fetch")
+    assert after["sock_read"] > before["sock_read"]
+    assert after["total"] > before["total"]
+    assert t.budgets("login_page")["sock_read"] == 5.0
+
+def test_failed_connect_is_recorded_per_kind(clock, monkeypatch):
+    monkeypatch.setattr(time, "perf_counter", clock)
+    m = metrics.RefreshMetrics()
+    trace = m.trace_config()
+    ctx = SimpleNamespace(trace_request_ctx={"kind": "login_page"})
+    asyncio.run(trace.on_request_start[0](None, ctx, PARAMS))
+    asyncio.run(trace.on_connection_create_start[0](None, ctx, PARAMS))
+    clock.advance(3.0)
+    asyncio.run(trace.on_request_exception[0](None, ctx, PARAMS))
+    assert m.last("login_page.connect") == 3.0
+    assert m.last("connect") == 3.0
+    assert m.last("server") is None
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from conftest import load
+
+transport = load("transport")
+R = transport.REDACTED
+
+def test_redact_every_scalar_under_person():
+    out = transport._redact({"person": {"n_person_id": 4242, "vc_name": "Ivanov", "b_active": True,
+                                        "contacts": [{"vc_phone": "+7900"}, 79001234567], "vc_note": None}})
+    assert out == {"person": {"n_person_id": R, "vc_name": R, "b_active": True,
+                              "contacts": [{"vc_phone": R}, R], "vc_note": None}}
+
+def test_redact_identifier_keys_anywhere():
+    out = transport._redact({"data": {"personal_accounts": [
+        {"n_account_id": 17, "vc_account": "123456", "n_sum_bal": 12.5}]}})
+    assert out == {"data": {"personal_accounts": [{"n_account_id": R, "vc_account": R, "n_sum_bal": 12.5}]}}
+
+def test_redact_keeps_decoder_keys():
+    node = {"servs": [{"n_serv_id": 300001, "equipment_addresses": [{"n_addr_type_id": 1006, "vc_code": "10.0.0.1"}]}]}
+    out = transport._redact(node)
+    assert out["servs"][0]["n_serv_id"] == 300001
+    assert out["servs"][0]["equipment_addresses"][0] == {"n_addr_type_id": 1006, "vc_code": R}